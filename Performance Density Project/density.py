@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+
+# Points per curve, seaborn.kdeplot's default
+GRID_SIZE = 200
+CUT = 3
+# Rows of (data point x grid point) kernel evaluations per chunk
+CHUNK_ROWS = 20000
+
+
+def scott_bandwidths(values, codes, n_groups, bw_adjust=1.0):
+    '''
+    Per-group Gaussian kernel bandwidths the way seaborn.kdeplot picks them:
+    scipy's Scott factor n ** (-1/5) times bw_adjust, times the group's
+    sample standard deviation.
+    '''
+    counts = np.bincount(codes, minlength=n_groups).astype(np.float64)
+    sums = np.bincount(codes, weights=values, minlength=n_groups)
+    means = np.divide(sums, counts, out=np.full(n_groups, np.nan), where=counts > 0)
+    sq = np.bincount(codes, weights=(values - means[codes]) ** 2, minlength=n_groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = np.sqrt(sq / (counts - 1))
+        factor = counts ** (-1 / 5) * bw_adjust
+    bandwidths = factor * std
+    # seaborn draws nothing for fewer than 2 points or zero variance
+    bandwidths[(counts < 2) | ~(bandwidths > 0)] = np.nan
+    return bandwidths, counts
+
+
+def batch_kde(values, groups, bw_adjust=1.0, gridsize=GRID_SIZE, cut=CUT):
+    '''
+    Gaussian KDEs for many groups at once, each evaluated on its own grid
+    over its own curve range, as seaborn.kdeplot does, so a player with
+    narrowly spread values gets as many points as any other.
+
+    Args:
+        values: array of observations
+        groups: array of group labels (e.g. player ids), same length
+        bw_adjust: float, bandwidth multiplier as in seaborn.kdeplot
+        gridsize: number of grid points per group
+        cut: how many bandwidths past each group's extremes its curve runs
+
+    Returns:
+        (labels, grids, densities): group labels, a (len(labels), gridsize)
+        array of each group's x grid and one of its densities (NaN rows
+        where no KDE could be fit)
+    '''
+    values = np.asarray(values, dtype=np.float64)
+    keep = ~np.isnan(values)
+    codes, labels = pd.factorize(np.asarray(groups)[keep], sort=False)
+    values = values[keep]
+    n_groups = len(labels)
+
+    bandwidths, counts = scott_bandwidths(values, codes, n_groups, bw_adjust)
+    fitted = ~np.isnan(bandwidths)
+
+    grids = np.full((n_groups, gridsize), np.nan)
+    if fitted.any():
+        mins = pd.Series(values).groupby(codes).min().reindex(range(n_groups)).to_numpy()
+        maxs = pd.Series(values).groupby(codes).max().reindex(range(n_groups)).to_numpy()
+        lows = mins[fitted] - cut * bandwidths[fitted]
+        highs = maxs[fitted] + cut * bandwidths[fitted]
+        grids[fitted] = lows[:, None] + (highs - lows)[:, None] * np.linspace(0.0, 1.0, gridsize)[None, :]
+
+    densities = np.zeros((n_groups, gridsize))
+    # Sort the points by group so each chunk's kernel rows can be summed
+    # per group with one reduceat
+    rows = np.flatnonzero(fitted[codes])
+    rows = rows[np.argsort(codes[rows], kind='stable')]
+    for start in range(0, len(rows), CHUNK_ROWS):
+        chunk = rows[start:start + CHUNK_ROWS]
+        chunk_codes = codes[chunk]
+        bw = bandwidths[chunk_codes][:, None]
+        kernel = np.exp(-0.5 * ((grids[chunk_codes] - values[chunk][:, None]) / bw) ** 2) / (bw * np.sqrt(2 * np.pi))
+        starts = np.flatnonzero(np.r_[True, chunk_codes[1:] != chunk_codes[:-1]])
+        densities[chunk_codes[starts]] += np.add.reduceat(kernel, starts, axis=0)
+
+    densities /= np.where(counts > 0, counts, 1)[:, None]
+    densities[~fitted] = np.nan
+    return labels, grids, densities
+
+
+def value_digests(values, groups):
+    '''
+    One digest per group of the group's values, independent of row order,
+    so a cached curve can be checked against the data it's asked for.
+
+    Returns:
+        (labels, digests): group labels and a uint64 digest per label
+    '''
+    codes, labels = pd.factorize(np.asarray(groups), sort=False)
+    hashes = pd.util.hash_pandas_object(pd.Series(np.asarray(values, dtype=np.float64)), index=False).to_numpy()
+    digests = np.zeros(len(labels), dtype=np.uint64)
+    np.add.at(digests, codes, hashes)
+    return labels, digests
+
+
+class DensityCache:
+    '''
+    KDE curves keyed by (player_id, season, metric, bw_adjust), each stored
+    with a digest of the values it was fit on.
+
+    curves() fits every player of a frame whose values are new or changed
+    in one batch_kde call, so plotting, ratings and exports can share curves
+    instead of refitting, and a second frame under the same label (another
+    season, or the same one after new games) never gets stale curves.
+    '''
+
+    def __init__(self):
+        self._curves = {}
+
+    def __len__(self):
+        return len(self._curves)
+
+    def clear(self):
+        self._curves.clear()
+
+    def curves(self, data, metric, season='all', bw_adjust=1.0, group_col='player_id'):
+        '''
+        KDE curves for every player in data.
+
+        Args:
+            data: dataframe with one row per observation
+            metric: String, column to estimate the density of
+            season: label stored in the cache key
+            bw_adjust: float, bandwidth multiplier as in seaborn.kdeplot
+            group_col: String, column identifying the player
+
+        Returns:
+            dict of player id -> (x, y) arrays over that player's own curve
+            range, or None where no KDE could be fit
+        '''
+        players, digests = value_digests(data[metric], data[group_col])
+        current = dict(zip(players, digests))
+        missing = [p for p in players
+                   if self._curves.get((p, season, metric, bw_adjust), (None,))[0] != current[p]]
+
+        if missing:
+            subset = data[data[group_col].isin(missing)] if len(missing) < len(players) else data
+            labels, grids, densities = batch_kde(subset[metric], subset[group_col], bw_adjust)
+            fitted = {}
+            for i, player in enumerate(labels):
+                curve = None
+                if not np.isnan(densities[i]).any():
+                    curve = (grids[i], densities[i])
+                fitted[player] = curve
+            for player in missing:
+                # Players with no usable values at all get None
+                self._curves[(player, season, metric, bw_adjust)] = (current[player], fitted.get(player))
+
+        return {p: self._curves[(p, season, metric, bw_adjust)][1] for p in players}
+
+    def snapshot(self):
+        '''
+        A copy of every cached curve, e.g. to seed worker processes.
+        '''
+        return dict(self._curves)
+
+    def restore(self, snapshot):
+        self._curves.update(snapshot)
+
+    def to_frame(self):
+        '''
+        All cached curves as a long dataframe, for export.
+        '''
+        frames = []
+        for (player, season, metric, bw_adjust), (_, curve) in self._curves.items():
+            if curve is None:
+                continue
+            frames.append(pd.DataFrame({
+                'player_id': player, 'season': season, 'metric': metric,
+                'bw_adjust': bw_adjust, 'x': curve[0], 'density': curve[1],
+            }))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+DENSITIES = DensityCache()
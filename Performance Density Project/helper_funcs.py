@@ -1,62 +1,72 @@
-import random
-import matplotlib.pyplot as plt
-import seaborn as sns
-from matplotlib.colors import LinearSegmentedColormap, Normalize
-from matplotlib.cm import ScalarMappable, get_cmap
-from itscalledsoccer.client import AmericanSoccerAnalysis
+# matplotlib is imported inside the plotting functions, so loading and
+# wrangling data (and the matchday job planning) don't pay for it
 import pandas as pd
 import os
 import numpy as np
-import matplotlib.font_manager as font_manager
-import matplotlib.patches as mpatches
-import matplotlib.ticker as mticker
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from timbers.asa import get_fetcher
+from timbers.flatten import flatten_nested
+from timbers.fonts import get_font
+from timbers.reference import REFERENCE
+from timbers.schema import compact
+from density import DENSITIES
+from ratings import gplus_scale, rate_games, sigmoid_rating
 
-def import_asa_timbers_data():
-    asa = AmericanSoccerAnalysis()
 
-    # Step 1: Get Teams and Games
-    teams = asa.get_teams()
-    games = asa.get_games(seasons=['2026'])
-    games['date_only'] = pd.to_datetime(games['date_time_utc']).dt.date
-    games['game_id'] = games['game_id'].astype(str)
-    games = games[['game_id', 'date_only']]
-    
-    # Step 2: Find Portland Timbers FC
-    timbers_rows = teams[teams["team_name"] == "Portland Timbers FC"]
-    timbers_id = timbers_rows["team_id"].values[0]  # <<< just grab the string
-
-    # Step 3: Get player g+ just for Timbers
-    gplus_data = asa.get_player_goals_added(
-        leagues=["mls"],
-        team_ids=[timbers_id],  # Now passing a real string inside a list
-        split_by_games=True
-    )
+def import_asa_timbers_data(season='2026'):
+    '''
+    One season of per-game Timbers g+ with game dates and player info.
 
-    player_data = asa.get_players(leagues=["mls"])
+    Args:
+        season: String, season to pull
 
+    Returns:
+        dataframe with one row per player per game, g+ still nested in 'data'
+    '''
+    asa = get_fetcher()
+
+    # Step 1: Load the games and players tables in the background while the
+    # teams table and the g+ pull run
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        games_future = pool.submit(REFERENCE.games, str(season))
+        players_future = pool.submit(REFERENCE.players)
+
+        # Step 2: Find Portland Timbers FC in the local teams table, then get
+        # player g+ just for Timbers
+        timbers_id = REFERENCE.team_id("Portland Timbers FC")
+        gplus_data = asa.get_player_goals_added(
+            leagues=["mls"],
+            team_ids=[timbers_id],  # Now passing a real string inside a list
+            season_name=str(season),
+            split_by_games=True
+        )
+        games_future.result()
+        players_future.result()
 
     gplus_data['game_id'] = gplus_data['game_id'].astype(str)
 
+    # Step 3: Game dates and player info, refetching either table if the
+    # pull has games or players it doesn't know yet
+    game_dates = REFERENCE.game_dates(str(season), require=gplus_data['game_id'].unique())
+    games = pd.DataFrame({'game_id': game_dates.index, 'date_only': game_dates.dt.date.to_numpy()})
+    player_data = REFERENCE.players(require=gplus_data['player_id'].unique())
+
     # Step 4: Merge player names and info with gplus_data
     main_df_sub = pd.merge(gplus_data, games, on='game_id', how='left')
     main_df = pd.merge(main_df_sub, player_data, on='player_id', how='left')
 
-
     return main_df
 
 def wrangle_data_by_player(main_df):
-    # Step 1: Expand the 'data' column into rows
-    expanded_data = main_df.explode('data')
-
-    # Step 2: Normalize the 'data' column (convert list of dictionaries into columns)
-    expanded_data = pd.concat(
-        [expanded_data.drop(columns=['data']), expanded_data['data'].apply(pd.Series)],
-        axis=1
-    )
+    # Step 1 + 2: Expand the 'data' column into rows and columns in one pass,
+    # with compact dtypes
+    expanded_data = compact(flatten_nested(main_df, 'data'))
 
     # Step 3: Group by player_id and calculate averages for relevant statistics
-    grouped_data = expanded_data.groupby('player_id').agg({
+    grouped_data = expanded_data.groupby('player_id', observed=True).agg({
         'goals_added_raw': 'mean',
         'goals_added_above_avg': 'mean',
         'count_actions': 'mean'
@@ -70,32 +80,66 @@ def wrangle_data_by_player(main_df):
 
 
 def wrangle_data(main_df):
-    # Step 1: Expand the 'data' column into rows
-    expanded_data = main_df.explode('data')
-
-    # Step 2: Normalize the 'data' column (convert list of dictionaries into columns)
-    expanded_data = pd.concat(
-        [expanded_data.drop(columns=['data']), expanded_data['data'].apply(pd.Series)],
-        axis=1
-    )
+    # Step 1 + 2: Expand the 'data' column into rows and columns in one pass,
+    # with compact dtypes
+    expanded_data = compact(flatten_nested(main_df, 'data'))
 
     return expanded_data
 
 def normalize_data(main_df):
-    min_ = main_df['goals_added_raw'].min()
-    max_ = main_df['goals_added_raw'].max()
-    # Standardize
-    z = (main_df['goals_added_raw'] - np.mean(main_df['goals_added_raw'])) / np.std(main_df['goals_added_raw'])
+    '''
+    Per-action-row ratings, returned on a copy of main_df. ratings.rate_games
+    rates player-games instead and doesn't copy the frame.
+    '''
+    # Ratings are computed in float64 even when goals_added_raw is float32
+    raw = main_df['goals_added_raw'].astype('float64')
+    min_ = raw.min()
+    max_ = raw.max()
+    # Standardize, squash with sigmoid and stretch to 4–10
+    return main_df.assign(rating=sigmoid_rating(raw, np.mean(raw), np.std(raw)),
+                          gplus=gplus_scale(raw, min_, max_))
 
-    # Squash with sigmoid and stretch to 4–10
-    main_df['rating'] = 4 + 6 * (1 / (1 + np.exp(-z)))  # Sigmoid scaled to [4,10]
-    main_df['gplus'] = ((main_df['goals_added_raw'] - min_) / (max_ - min_))
 
-    return main_df
 
+def gradient_fill(ax, x, y, cmap, norm, alpha=0.8):
+    '''
+    Fill the area under a curve, colouring the strip between each pair of
+    adjacent x points by cmap(norm(x)) of its left edge. Draws the same
+    quads as one fill_between per segment, but as a single PolyCollection.
 
+    Args:
+        ax: matplotlib axes to draw on
+        x: array of curve x values (sorted)
+        y: array of curve y values
+        cmap: colormap
+        norm: Normalize mapping x values onto the colormap
+        alpha: float, fill transparency
 
-def plot_each_player(data, output_dir = "Player Distributions"):
+    Returns:
+        The PolyCollection
+    '''
+    from matplotlib.collections import PolyCollection
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    zeros = np.zeros(len(x) - 1)
+
+    # One quad per segment: (x0, 0) -> (x0, y0) -> (x1, y1) -> (x1, 0)
+    verts = np.stack([
+        np.column_stack([x[:-1], zeros]),
+        np.column_stack([x[:-1], y[:-1]]),
+        np.column_stack([x[1:], y[1:]]),
+        np.column_stack([x[1:], zeros]),
+    ], axis=1)
+    colors = cmap(norm(x[:-1]))
+
+    collection = PolyCollection(verts, facecolors=colors, edgecolors=colors, alpha=alpha)
+    ax.add_collection(collection, autolim=True)
+    ax.autoscale_view()
+    return collection
+
+
+def plot_each_player(data, output_dir = "Player Distributions", season = "all"):
     '''
     Take player data and create a graph distribution of past performances based
     on that, outputting every player's graph to a specified folder.
@@ -103,11 +147,13 @@ def plot_each_player(data, output_dir = "Player Distributions"):
     Args:
         data: dataframe with each row being a player in a specific game
         output_dir: String, specified output directory for graphs
+        season: label for the cached KDE curves
     
     Returns:
         Nothing
     '''
-    players = data['player_id'].unique()  
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LinearSegmentedColormap, Normalize
 
     # Step 1: Normalize the 'goals_added_raw' values for consistent coloring
     all_values = data['goals_added_raw']
@@ -117,33 +163,29 @@ def plot_each_player(data, output_dir = "Player Distributions"):
     colors = [(1, 0, 0), (1, 1, 0), (0, 1, 0)]  # Red -> Yellow -> Green
     custom_cmap = LinearSegmentedColormap.from_list("custom_cmap", colors)
 
-    for player_id in players:
-        # Filter data for the current player
-        player_data = data[data['player_id'] == player_id]
-        
+    # KDEs for every player at once, reused across calls
+    curves = DENSITIES.curves(data, 'goals_added_raw', season=season)
+
+    # One pass over the frame instead of a boolean scan per player
+    for player_id, player_data in data.groupby('player_id', sort=False, observed=True):
         # Skip if there are not enough data points
         if player_data['goals_added_raw'].dropna().shape[0] < 2:
             print(f"Skipping player {player_id} due to insufficient data.")
             continue
 
-        # Create a histogram or KDE plot for 'goals_added_raw'
-        plt.figure(figsize=(8, 6))
-        kde = sns.kdeplot(player_data['goals_added_raw'], fill=False, color='black', linewidth=1.5)
-        
-        # Get the KDE values
-        line = kde.get_lines()
-        if not line:  # Check if KDE plot was generated
+        # Get the player's KDE curve (fit in one batch for all players)
+        curve = curves[player_id]
+        if curve is None:  # Check if a KDE could be fit
             print(f"No KDE plot generated for player {player_id}. Skipping.")
             continue
-        x, y = line[0].get_data()
+        x, y = curve
+
+        # Create a KDE plot for 'goals_added_raw'
+        plt.figure(figsize=(8, 6))
+        plt.plot(x, y, color='black', linewidth=1.5)
 
         # Fill the area under the curve with colors
-        for i in range(len(x) - 1):
-            plt.fill_between(
-                x[i:i+2], 0, y[i:i+2],
-                color=custom_cmap(norm(x[i])),  # Map the x-value to a color
-                alpha=0.8
-            )
+        gradient_fill(plt.gca(), x, y, custom_cmap, norm, alpha=0.8)
         
         # Add labels and title
         player_name = player_data['player_name'].iloc[0]  # Get the player's name
@@ -159,10 +201,10 @@ def plot_each_player(data, output_dir = "Player Distributions"):
         plt.close()
 
 
-def plot_a_game(data, game_date, vs_team, data_bool, output_file = "out", save_fig = False):
+def plot_a_game(data, game_date, vs_team, data_bool, output_file = "out", save_fig = False, season = "all", ratings = None):
     '''
-    Take player data and create a plot all player distributions in data (max 11)
-    on one chart
+    Take player data and create a plot all player distributions in data
+    on one chart, four to a row
     
     Args:
         data: dataframe with each row being a player in a specific game
@@ -171,10 +213,16 @@ def plot_a_game(data, game_date, vs_team, data_bool, output_file = "out", save_f
         data_bool: bool, if false then g_added_raw, else g_added_above_avg
         output_file: String, specified output file name for graph
         save_fig: Boolean, whether or not to save the graph to file
+        season: label for the cached KDE curves
+        ratings: optional result of ratings.rate_games(data), computed here
+            if not given
     
     Returns:
         Nothing
     '''
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LinearSegmentedColormap, Normalize
+
     data_setting = 'goals_added_raw'
     if data_bool:
         data_setting = 'goals_added_above_avg'
@@ -192,16 +240,26 @@ def plot_a_game(data, game_date, vs_team, data_bool, output_file = "out", save_f
     chosen_game = data[data['date_only'] == game_date]
     players = chosen_game['player_id'].unique()
 
-    # Step 4: Create a 4x4 grid for subplots
-    fig, axes = plt.subplots(4, 4, figsize=(24, 18))  # 6 rows, 2 columns
+    # Ratings for just this game's player-games
+    if ratings is None:
+        ratings = rate_games(data)
+    game_keys = pd.MultiIndex.from_frame(chosen_game[['player_id', 'game_id']].drop_duplicates().astype(object))
+    todays_ratings = ratings['rating'].reindex(game_keys).droplevel('game_id')
+
+    # KDEs for every player at once, reused across games
+    curves = DENSITIES.curves(data, data_setting, season=season, bw_adjust=0.42)
+
+    # Step 4: Create a grid for subplots, 4 columns and as many rows as the
+    # game's players need (4x4 for up to 16)
+    n_rows = max(1, -(-len(players) // 4))
+    fig, axes = plt.subplots(n_rows, 4, figsize=(24, 4.5 * n_rows), squeeze=False)
     axes = axes.flatten()  # Flatten the 2D array of axes for easier indexing
 
     
 
 
-    # Load font
-    font_path = '../Fonts/Arvo-Bold.ttf'
-    font_props = font_manager.FontProperties(fname=font_path)
+    # Load font (parsed once per process, independent of the working directory)
+    font_props = get_font('Arvo-Bold')
 
     # Set background
     fig.patch.set_facecolor('#1a1a1a')  
@@ -211,40 +269,39 @@ def plot_a_game(data, game_date, vs_team, data_bool, output_file = "out", save_f
                  fontproperties = font_props, 
                  fontsize=40, color='white', weight='bold', y=0.96)
 
+    # Group once so each player's rows are a lookup rather than a full scan
+    player_groups = data.groupby('player_id', sort=False, observed=True)
+    game_groups = chosen_game.groupby('player_id', sort=False, observed=True)
+
     # Step 5: Plot each player's distribution in a subplot
     for i, player_id in enumerate(players):
         axes[i].set_facecolor('#1a1a1a')
-        # Filter data for the current player
-        player_data = data[data['player_id'] == player_id]
-        chosen_game_player = chosen_game[chosen_game['player_id'] == player_id]
+        # Rows for the current player
+        player_data = player_groups.get_group(player_id)
+        chosen_game_player = game_groups.get_group(player_id)
         if chosen_game_player.empty:
             print(f"PLAYER DATA MISSING FOR {player_id} on {game_date}. Skipping.")
             continue
         todays_perf = chosen_game_player[data_setting].iloc[0]
-        todays_rat = chosen_game_player['rating'].iloc[0]
+        todays_rat = todays_ratings.loc[player_id]
         
         # Skip if there are not enough data points
         if player_data[data_setting].dropna().shape[0] < 2:
             print(f"Skipping player {player_id} due to insufficient data.")
             continue
         
-        # Create a KDE plot for 'goals_added_raw'
-        kde = sns.kdeplot(player_data[data_setting], ax=axes[i], fill=False, color='white', linewidth=1.5, bw_adjust = 0.42)
-        
-        # Get the KDE values
-        line = kde.get_lines()
-        if not line:  # Check if KDE plot was generated
+        # Get the player's KDE curve (fit in one batch for all players)
+        curve = curves[player_id]
+        if curve is None:  # Check if a KDE could be fit
             print(f"No KDE plot generated for player {player_id}. Skipping.")
             continue
-        x, y = line[0].get_data()  # Extract x and y data from the first Line2D object
+        x, y = curve
+
+        # Create a KDE plot for 'goals_added_raw'
+        axes[i].plot(x, y, color='white', linewidth=1.5)
         
         # Fill the area under the curve with colors
-        for j in range(len(x) - 1):
-            axes[i].fill_between(
-                x[j:j+2], 0, y[j:j+2],
-                color=custom_cmap(norm(x[j])),  # Map the x-value to the custom colormap
-                alpha=0.8
-            )
+        gradient_fill(axes[i], x, y, custom_cmap, norm, alpha=0.8)
         
         # Add title to each subplot
         player_name = player_data['player_name'].iloc[0]  # Get the player's name
@@ -262,7 +319,8 @@ def plot_a_game(data, game_date, vs_team, data_bool, output_file = "out", save_f
     plt.tight_layout(rect=[0.025, 0.025, 0.975, 0.95])  # Reserve space for the title
 
     if save_fig:
-        plt.savefig("output_file")
+        os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+        plt.savefig(output_file)
     else:
         plt.show()
 
@@ -0,0 +1,155 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+from density import DENSITIES
+from helper_funcs import import_asa_timbers_data, wrangle_data, plot_a_game
+from ratings import rate_games
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from timbers.reference import REFERENCE
+from timbers.render import render_jobs
+
+MANIFEST_NAME = ".matchday_manifest.json"
+KDE_BW_ADJUST = 0.42
+
+# Figures are re-rendered when the drawing or KDE code changes, not just the data
+_code = hashlib.sha1()
+for _name in ("helper_funcs.py", "density.py", "ratings.py"):
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), _name), 'rb') as f:
+        _code.update(f.read())
+CODE_HASH = _code.hexdigest()
+
+# Set in each worker by _init_worker
+_WORKER = {}
+
+
+def _opponents(season, team_id):
+    '''
+    game_id -> opponent abbreviation for a team's games in a season.
+    '''
+    games = REFERENCE.games(season)
+    abbreviations = REFERENCE.team_abbreviations()
+    home = games['home_team_id'] == team_id
+    opponent_ids = games['away_team_id'].where(home, games['home_team_id'])
+    return pd.Series(opponent_ids.map(abbreviations).to_numpy(), index=games['game_id'])
+
+
+def _digest(frame):
+    return hashlib.sha1(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes()).hexdigest()
+
+
+def build_jobs(data, ratings, season='2026', data_bool=True, output_dir="Matchday Reports"):
+    '''
+    One plot_a_game job per game in the wrangled season frame.
+
+    Each job carries a digest of everything its figure depends on: the
+    game's players' rows (their KDE curves), the colour scale range, the
+    game's ratings and the drawing code.
+
+    Args:
+        data: wrangled per-action rows for the season (wrangle_data output)
+        ratings: rate_games(data)
+        season: String, season used for opponent lookups and KDE cache keys
+        data_bool: bool, if false then g_added_raw, else g_added_above_avg
+        output_dir: String, where to write the PNGs
+
+    Returns:
+        list of job dicts
+    '''
+    data_setting = 'goals_added_above_avg' if data_bool else 'goals_added_raw'
+    value_range = (float(data[data_setting].min()), float(data[data_setting].max()))
+    team_id = data['team_id'].mode().iloc[0]
+    opponents = _opponents(season, team_id)
+
+    played = data.dropna(subset=['date_only'])
+    player_rows = data.groupby('player_id', sort=False, observed=True)
+
+    jobs = []
+    for (game_id, game_date), game_rows in played.groupby(['game_id', 'date_only'], sort=True, observed=True):
+        vs_team = opponents.get(str(game_id), 'OPP')
+        if pd.isna(vs_team):
+            vs_team = 'OPP'
+        players = game_rows['player_id'].unique()
+        players_digest = hashlib.sha1(''.join(
+            _digest(player_rows.get_group(p)[['game_id', data_setting]]) for p in players
+        ).encode()).hexdigest()
+        game_ratings = ratings['rating'].xs(game_id, level='game_id').reindex(players)
+
+        job = {
+            'game_id': str(game_id),
+            'game_date': str(game_date),
+            'vs_team': vs_team,
+            'data_bool': bool(data_bool),
+            'season': str(season),
+            'output_file': os.path.join(output_dir, f"{game_date}_vs_{vs_team}.png"),
+        }
+        job['digest'] = hashlib.sha1(json.dumps({
+            'job': job, 'players': players_digest, 'range': value_range,
+            'ratings': [None if pd.isna(r) else round(float(r), 12) for r in game_ratings],
+            'code': CODE_HASH,
+        }, sort_keys=True).encode()).hexdigest()
+        jobs.append(job)
+
+    return jobs
+
+
+def _init_worker(data, ratings, curves):
+    DENSITIES.restore(curves)
+    _WORKER['data'] = data
+    _WORKER['ratings'] = ratings
+
+
+def _render(job):
+    plot_a_game(_WORKER['data'], job['game_date'], job['vs_team'], job['data_bool'],
+                output_file=job['output_file'], save_fig=True, season=job['season'],
+                ratings=_WORKER['ratings'])
+    return job['output_file']
+
+
+def render_season(data, ratings, jobs, workers=None, force=False):
+    '''
+    Render every game's 4x4 distribution grid across worker processes,
+    skipping figures whose inputs haven't changed since they were written.
+    The KDE curves are fitted once here and handed to every worker.
+
+    Returns:
+        list of written output paths
+    '''
+    start = time.perf_counter()
+
+    def worker_args(todo):
+        # Fit every player's curves once, for both metrics the jobs use
+        for data_bool in {job['data_bool'] for job in todo}:
+            data_setting = 'goals_added_above_avg' if data_bool else 'goals_added_raw'
+            for season in {job['season'] for job in todo}:
+                DENSITIES.curves(data, data_setting, season=season, bw_adjust=KDE_BW_ADJUST)
+        return data, ratings, DENSITIES.snapshot()
+
+    written, skipped = render_jobs(jobs, _render, MANIFEST_NAME, 'output_file', lambda job: job['digest'],
+                                   workers=workers, force=force, initializer=_init_worker, initargs=worker_args)
+
+    elapsed = time.perf_counter() - start
+    print(f"Rendered {len(written)} games, skipped {skipped} unchanged, in {elapsed:.1f}s")
+    return written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Render every Timbers game's distribution grid for a season recap")
+    parser.add_argument("--season", default='2026')
+    parser.add_argument("--raw", action="store_true", help="plot goals_added_raw instead of above average")
+    parser.add_argument("--output-dir", default="Matchday Reports")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    # One data load and wrangle for the whole season
+    main_df = wrangle_data(import_asa_timbers_data(args.season))
+    ratings = rate_games(main_df)
+    jobs = build_jobs(main_df, ratings, season=args.season, data_bool=not args.raw, output_dir=args.output_dir)
+    render_season(main_df, ratings, jobs, workers=args.workers, force=args.force)
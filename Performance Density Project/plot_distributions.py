@@ -1,9 +1,11 @@
-from helper_funcs import import_asa_timbers_data, wrangle_data, plot_a_game, normalize_data
+from helper_funcs import import_asa_timbers_data, wrangle_data, plot_a_game
+from ratings import rate_games
 
 
 if __name__ == '__main__':
     raw_data_imported = import_asa_timbers_data()
     main_df = wrangle_data(raw_data_imported)
     #plot_on_one_graph(main_df,"output",True)
-    plot_a_game(normalize_data(main_df),'2026-05-14','HOU',True,"output",True)
+    ratings = rate_games(main_df)
+    plot_a_game(main_df,'2026-05-14','HOU',True,"output",True,ratings=ratings)
 
@@ -0,0 +1,216 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from timbers.cache import atomic_write_json
+
+
+def sigmoid_rating(values, mean, std):
+    '''
+    The 4-10 game rating: a z-score squashed with a sigmoid and stretched
+    to [4, 10].
+    '''
+    z = (np.asarray(values, dtype=np.float64) - mean) / std
+    return 4 + 6 * (1 / (1 + np.exp(-z)))
+
+
+def gplus_scale(values, min_, max_):
+    '''
+    goals_added_raw rescaled to [0, 1] over the observed range.
+    '''
+    return (np.asarray(values, dtype=np.float64) - min_) / (max_ - min_)
+
+
+def player_game_totals(rows, column='goals_added_raw'):
+    '''
+    Sum a per-action column to one value per player per game.
+
+    Returns:
+        Series indexed by (player_id, game_id)
+    '''
+    return rows.groupby(['player_id', 'game_id'], sort=False, observed=True)[column].sum(min_count=1)
+
+
+def rate_games(rows, column='goals_added_raw'):
+    '''
+    Game ratings at player-game level: the per-action rows are summed to
+    one total per player per game, and the rating statistics are taken
+    over those totals. The input frame is left untouched.
+
+    Args:
+        rows: per-action rows with player_id, game_id and column
+        column: String, the g+ column to rate
+
+    Returns:
+        dataframe indexed by (player_id, game_id) with the total, rating
+        and gplus columns
+    '''
+    totals = player_game_totals(rows, column)
+    values = totals.to_numpy(dtype=np.float64)
+    return pd.DataFrame({
+        column: values,
+        'rating': sigmoid_rating(values, np.nanmean(values), np.nanstd(values)),
+        'gplus': gplus_scale(values, np.nanmin(values), np.nanmax(values)),
+    }, index=totals.index)
+
+
+class RunningStats:
+    '''
+    Count, mean, variance (Welford / Chan et al. batch update), min and max
+    of a stream of values, updated one batch at a time.
+    '''
+
+    def __init__(self, n=0, mean=0.0, m2=0.0, min_=np.inf, max_=-np.inf):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+        self.min = min_
+        self.max = max_
+
+    @property
+    def std(self):
+        # Population std, as np.std
+        return np.sqrt(self.m2 / self.n) if self.n else np.nan
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        # Merge the batch's own count/mean/M2 into the running ones
+        n_b = len(values)
+        mean_b = values.mean()
+        m2_b = ((values - mean_b) ** 2).sum()
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta ** 2 * self.n * n_b / n
+        self.n = n
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        return self
+
+    def copy(self):
+        return RunningStats(self.n, self.mean, self.m2, self.min, self.max)
+
+    def to_dict(self):
+        return {'n': self.n, 'mean': self.mean, 'm2': self.m2, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state['n'], state['mean'], state['m2'], state['min'], state['max'])
+
+
+class RatingEngine:
+    '''
+    Streaming version of rate_games.
+
+    Each game's rows are ingested once: they're summed to player-game totals
+    as in rate_games, the running statistics are updated with those totals
+    and the game's ratings come straight out, without reloading or
+    re-rating earlier games. Once freeze() is called (or a reference window
+    is passed in), ratings are computed against those fixed statistics, so
+    a game's rating no longer depends on which games arrived after it.
+    '''
+
+    def __init__(self, column='goals_added_raw', reference=None):
+        self.column = column
+        self.stats = RunningStats()
+        self.reference = reference
+        self.game_ids = set()
+
+    @classmethod
+    def from_reference(cls, reference_rows, column='goals_added_raw'):
+        '''
+        An engine frozen against a fixed window of per-action rows, e.g.
+        last season, rated at player-game level.
+        '''
+        engine = cls(column)
+        engine.stats.update(player_game_totals(reference_rows, column))
+        engine.freeze()
+        return engine
+
+    @property
+    def frozen(self):
+        return self.reference is not None
+
+    def freeze(self):
+        '''
+        Fix the statistics ratings are computed against at their current
+        values. Later games still update self.stats.
+        '''
+        self.reference = self.stats.copy()
+
+    def unfreeze(self):
+        self.reference = None
+
+    def rate(self, values):
+        '''
+        Ratings and gplus for values against the current (or frozen)
+        statistics.
+
+        Returns:
+            (rating, gplus) arrays
+        '''
+        stats = self.reference if self.frozen else self.stats
+        return sigmoid_rating(values, stats.mean, stats.std), gplus_scale(values, stats.min, stats.max)
+
+    def ingest(self, game_rows, game_id=None):
+        '''
+        Add one game's per-action rows and rate its player-games. A game
+        that was already ingested is rated but not counted twice.
+
+        Args:
+            game_rows: dataframe of one game's rows with player_id, game_id
+                and the rated column
+            game_id: optional id, defaults to the rows' game_id
+
+        Returns:
+            dataframe indexed by (player_id, game_id) with the total, rating
+            and gplus columns, as rate_games
+        '''
+        if game_id is None and len(game_rows):
+            game_id = game_rows['game_id'].iloc[0]
+        totals = player_game_totals(game_rows, self.column)
+        values = totals.to_numpy(dtype=np.float64)
+        if game_id is None or str(game_id) not in self.game_ids:
+            self.stats.update(values)
+            if game_id is not None:
+                self.game_ids.add(str(game_id))
+
+        rating, gplus = self.rate(values)
+        return pd.DataFrame({self.column: values, 'rating': rating, 'gplus': gplus}, index=totals.index)
+
+    def ingest_games(self, rows, game_col='game_id', order_col='date_only'):
+        '''
+        Ingest every game in rows in kickoff order, rating each as it lands.
+        '''
+        rated = []
+        ordered = rows.sort_values(order_col, kind='stable') if order_col in rows.columns else rows
+        for game_id, game_rows in ordered.groupby(game_col, sort=False, observed=True):
+            rated.append(self.ingest(game_rows, game_id))
+        return rated
+
+    def save(self, path):
+        atomic_write_json({
+            'column': self.column,
+            'stats': self.stats.to_dict(),
+            'reference': None if self.reference is None else self.reference.to_dict(),
+            'game_ids': sorted(self.game_ids),
+        }, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            state = json.load(f)
+        engine = cls(state['column'])
+        engine.stats = RunningStats.from_dict(state['stats'])
+        if state['reference'] is not None:
+            engine.reference = RunningStats.from_dict(state['reference'])
+        engine.game_ids = set(state['game_ids'])
+        return engine
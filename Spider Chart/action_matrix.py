@@ -0,0 +1,100 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+
+PARAMS = ['Dribbling', 'Fouling', 'Interrupting', 'Passing', 'Receiving', 'Shooting']
+
+_MATRIX_CACHE = {}
+
+
+class ActionMatrix:
+    '''
+    A season's goals-added in wide form: one row per (player, position,
+    team) combination of the grouped frame, one column per action type in
+    PARAMS order, plus metadata arrays aligned with the rows.
+
+    Everything downstream (percentile pools, radar inputs, improvement and
+    similarity scores) slices these arrays instead of filtering the long
+    frame by action_type.
+
+    Attributes:
+        values: (n, 6) float64 array of per 90 values, NaN where missing
+        player_id, player_name, general_position, team_id: (n,) arrays
+        minutes: (n,) array of minutes played
+    '''
+
+    def __init__(self, grouped_data, value_col='goals_added_raw_per90'):
+        self.value_col = value_col
+
+        # Step 1: One row per metadata combination, in order of appearance
+        keys = ['player_id', 'general_position', 'team_id']
+        rows = grouped_data.groupby(keys, sort=False, dropna=False, observed=True).ngroup().to_numpy()
+        first = np.unique(rows, return_index=True)[1]
+        meta = grouped_data.iloc[first]
+        self.player_id = meta['player_id'].astype(object).to_numpy()
+        self.player_name = meta['player_name'].astype(object).to_numpy()
+        self.general_position = meta['general_position'].astype(object).to_numpy()
+        self.team_id = meta['team_id'].astype(object).to_numpy()
+
+        # Step 2: Scatter the long rows into the matrix
+        cols = pd.Categorical(grouped_data['action_type'].astype(object), categories=PARAMS).codes
+        known = cols >= 0
+        self.values = np.full((len(meta), len(PARAMS)), np.nan)
+        self.values[rows[known], cols[known]] = grouped_data[value_col].to_numpy(dtype=np.float64)[known]
+
+        # Minutes are the same on each of a player's action type rows
+        self.minutes = meta['minutes_played'].to_numpy(dtype=np.float64)
+
+        self._by_position = pd.Series(np.arange(len(meta))).groupby(self.general_position, sort=False).indices
+
+    def __len__(self):
+        return len(self.values)
+
+    def position_rows(self, position):
+        '''
+        Row indices of every player listed at the position.
+        '''
+        return self._by_position.get(position, np.empty(0, dtype=np.intp))
+
+    def pool_rows(self, position, min_minutes):
+        '''
+        Row indices of the position's comparison pool: players above
+        min_minutes.
+        '''
+        rows = self.position_rows(position)
+        return rows[self.minutes[rows] > min_minutes]
+
+    def player_rows(self, rows):
+        '''
+        The first row of each distinct player among rows.
+        '''
+        _, first = np.unique(self.player_id[rows], return_index=True)
+        return rows[np.sort(first)]
+
+    def frame(self, rows=None):
+        '''
+        The matrix (or some of its rows) as a dataframe with player_id,
+        player_name and general_position columns.
+        '''
+        rows = np.arange(len(self)) if rows is None else rows
+        frame = pd.DataFrame(self.values[rows], columns=PARAMS)
+        frame.insert(0, 'player_id', self.player_id[rows])
+        frame.insert(1, 'player_name', self.player_name[rows])
+        frame.insert(2, 'general_position', self.general_position[rows])
+        return frame
+
+
+def get_action_matrix(grouped_data, value_col='goals_added_raw_per90'):
+    '''
+    Build (or reuse) the ActionMatrix for a season frame. Matrices are
+    cached for as long as the frame lives.
+    '''
+    key = (id(grouped_data), value_col)
+    cached = _MATRIX_CACHE.get(key)
+    if cached is not None and cached[0]() is grouped_data:
+        return cached[1]
+
+    matrix = ActionMatrix(grouped_data, value_col)
+    _MATRIX_CACHE[key] = (weakref.ref(grouped_data, lambda _: _MATRIX_CACHE.pop(key, None)), matrix)
+    return matrix
@@ -0,0 +1,152 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+from season_data import get_data
+from radar import draw_radar_chart, radar_outpath
+from percentiles import PARAMS, get_percentile_index
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from timbers.reference import REFERENCE
+from timbers.render import render_jobs
+
+POSITION_NAMES = {
+    'GK': 'Goalkeeper',
+    'CB': 'Defender',
+    'FB': 'Fullback',
+    'DM': 'Defensive Midfielder',
+    'CM': 'Central Midfielder',
+    'AM': 'Attacking Midfielder',
+    'W': 'Winger',
+    'ST': 'Striker',
+}
+MANIFEST_NAME = ".radar_manifest.json"
+
+# Charts are re-rendered when the drawing code changes, not just the data
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "radar.py"), 'rb') as f:
+    CHART_CODE_HASH = hashlib.sha1(f.read()).hexdigest()
+
+
+def build_jobs(season, positions, roster=None, team=None, team_name='Portland',
+               second_season=None, min_minutes=200, output_dir="Output", dpi=300):
+    '''
+    Work out every radar chart to draw, computing all percentiles up front
+    with one PercentileIndex per season and position.
+
+    Args:
+        season: String, season to chart
+        positions: list of position codes, e.g. ['CB', 'FB']
+        roster: optional list of player names to limit the charts to
+        team: optional team abbreviation to limit the charts to
+        team_name: String, team label drawn on each chart
+        second_season: optional String, season to overlay for comparison
+        min_minutes: minutes threshold of the comparison pool
+        output_dir: String, where to write the PNGs
+        dpi: resolution of the saved PNGs
+
+    Returns:
+        list of keyword-argument dicts for draw_radar_chart, one per
+        output file: a player listed under several positions is charted
+        at their primary one
+    '''
+    # Only the charted positions' partitions are read
+    grouped_data = get_data(season, positions=positions)
+    second_data = get_data(second_season, positions=positions) if second_season is not None else None
+
+    if team is not None:
+        team_ids = REFERENCE.team_ids(team)
+        on_team = grouped_data.loc[grouped_data['team_id'].isin(team_ids), 'player_name'].unique()
+        roster = set(on_team) if roster is None else set(roster) & set(on_team)
+
+    names = grouped_data[['player_id', 'player_name']].astype(object).drop_duplicates('player_id')
+    primary = dict(zip(names['player_name'], names['player_id'].map(REFERENCE.player_positions())))
+
+    # Keyed by output file, so two positions never render into one PNG
+    jobs = {}
+    for position in positions:
+        table = get_percentile_index(grouped_data, position, min_minutes).table(roster)
+        if second_data is not None:
+            second_table = get_percentile_index(second_data, position, min_minutes).table(roster)
+            second_table = second_table.dropna(subset=PARAMS).drop_duplicates('player_name').set_index('player_name')
+
+        table = table.dropna(subset=PARAMS).drop_duplicates('player_name')
+        for _, row in table.iterrows():
+            percentile = [float(row[param]) for param in PARAMS]
+            job = {
+                'percentile': percentile,
+                'player_name': row['player_name'],
+                'position_name': POSITION_NAMES.get(position, position),
+                'team_name': team_name,
+                'season': str(season),
+                'dpi': dpi,
+            }
+            if second_data is not None:
+                if row['player_name'] not in second_table.index:
+                    continue
+                job.update({
+                    'compare': True,
+                    'second_percentile': [float(second_table.at[row['player_name'], param]) for param in PARAMS],
+                    'second_season': str(second_season),
+                })
+            job['outpath'] = radar_outpath(job['player_name'], job['season'], job.get('second_season'), output_dir)
+            if job['outpath'] in jobs and position != primary.get(row['player_name']):
+                continue
+            jobs[job['outpath']] = job
+
+    return list(jobs.values())
+
+
+def _job_hash(job):
+    payload = json.dumps(job, sort_keys=True).encode() + CHART_CODE_HASH.encode()
+    return hashlib.sha1(payload).hexdigest()
+
+
+def _render(job):
+    return draw_radar_chart(**job)
+
+
+def render_batch(jobs, workers=None, force=False):
+    '''
+    Render radar charts across a pool of worker processes on the Agg
+    backend, skipping charts whose inputs haven't changed since they were
+    last written.
+
+    Args:
+        jobs: list of draw_radar_chart keyword dicts, e.g. from build_jobs
+        workers: number of worker processes, defaults to the CPU count
+        force: Boolean, re-render everything
+
+    Returns:
+        list of written output paths
+    '''
+    start = time.perf_counter()
+    written, skipped = render_jobs(jobs, _render, MANIFEST_NAME, 'outpath', _job_hash, workers=workers, force=force)
+
+    elapsed = time.perf_counter() - start
+    rate = len(written) / elapsed if elapsed > 0 else 0.0
+    print(f"Rendered {len(written)} charts, skipped {skipped} unchanged, "
+          f"in {elapsed:.1f}s ({rate:.2f} charts/s)")
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render radar charts for a roster or positions in parallel")
+    parser.add_argument("season")
+    parser.add_argument("--positions", nargs="+", default=['CB', 'FB', 'DM', 'CM', 'AM', 'W', 'ST'])
+    parser.add_argument("--players", nargs="+", default=None)
+    parser.add_argument("--team", default='POR')
+    parser.add_argument("--team-name", default='Portland')
+    parser.add_argument("--compare", default=None, help="second season to overlay")
+    parser.add_argument("--output-dir", default="Output")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    jobs = build_jobs(args.season, args.positions, roster=args.players, team=args.team,
+                      team_name=args.team_name, second_season=args.compare,
+                      output_dir=args.output_dir, dpi=args.dpi)
+    render_batch(jobs, workers=args.workers, force=args.force)
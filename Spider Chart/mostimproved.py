@@ -1,10 +1,13 @@
-from spiderchart import get_data, draw_radar_chart
-import matplotlib.pyplot as plt
+import argparse
+
+from season_data import get_data
+from radar import draw_radar_chart
 import pandas as pd
-from itscalledsoccer.client import AmericanSoccerAnalysis
-from scipy import stats
+import numpy as np
+from percentiles import PARAMS, get_fallback_index, league_percentiles
+from timbers.identity import get_identity
+from timbers.reference import REFERENCE
 
-PARAMS = ['Dribbling', 'Fouling', 'Interrupting', 'Passing', 'Receiving', 'Shooting']
 POSITION_WEIGHTS = {
     'ST': {
         'Dribbling': 1.0,
@@ -64,56 +67,38 @@ POSITION_WEIGHTS = {
     },
 }
 
+# Players listed at several positions who should be compared at this one
+PREFERRED_POSITIONS = {
+    "Antony": "W",
+    "Jimer Fory": "FB",
+}
+
 
-def calculate_percentiles_with_fallback(grouped_data, player_name, position):
-    player_df = grouped_data[
-        (grouped_data['player_name'] == player_name)
-        & (grouped_data['general_position'] == position)
-    ]
+def preferred_positions():
+    '''
+    PREFERRED_POSITIONS keyed by ASA player_id, so the names above match
+    however ASA spells them.
+    '''
+    ids = get_identity().resolve(list(PREFERRED_POSITIONS))
+    return {player_id: position for player_id, position in zip(ids, PREFERRED_POSITIONS.values())
+            if pd.notna(player_id)}
 
-    if player_df.empty:
-        return []
 
+def calculate_percentiles_with_fallback(grouped_data, player_name=None, position=None, player_id=None):
     # Early-season data often has no positional peers above 800 minutes,
-    # so relax the threshold until a usable comparison pool exists.
-    position_data = pd.DataFrame()
-    for min_minutes in (800, 400, 180, 90, 0):
-        candidate = grouped_data[
-            (grouped_data['general_position'] == position)
-            & (grouped_data['minutes_played'] > min_minutes)
-        ]
-        if candidate['player_id'].nunique() >= 10 or min_minutes == 0:
-            position_data = candidate
-            break
-
-    percentile = []
-    for param in PARAMS:
-        param_all = position_data[
-            position_data['action_type'] == param
-        ]['goals_added_raw_per90'].dropna()
-        param_player = player_df[
-            player_df['action_type'] == param
-        ]['goals_added_raw_per90'].dropna()
-
-        if param_all.empty or param_player.empty:
-            return []
-
-        percentile.append(float(stats.percentileofscore(param_all, param_player.iloc[0])))
-
-    return percentile
-
-
-def resolve_comparable_position(player, prev_rows, curr_rows):
+    # so the index relaxes the threshold until a usable comparison pool exists.
+    index = get_fallback_index(grouped_data, position)
+    return index.percentiles(player_name, player_id=player_id)
+
+
+def resolve_comparable_position(player_id, prev_rows, curr_rows, preferred_by_id=None):
     prev_positions = set(prev_rows['general_position'].dropna())
     curr_positions = set(curr_rows['general_position'].dropna())
     shared_positions = prev_positions & curr_positions
 
-    preferred_positions = {
-        "Antony": "W",
-        "Jimer Fory": "FB",
-    }
-
-    preferred = preferred_positions.get(player)
+    if preferred_by_id is None:
+        preferred_by_id = preferred_positions()
+    preferred = preferred_by_id.get(player_id)
     if preferred and preferred in shared_positions:
         return preferred, preferred
 
@@ -133,34 +118,122 @@ def calculate_weighted_average_percentile_change(p_prev, p_curr, position):
     total_weight = sum(weights_by_param[param] for param in PARAMS)
     return weighted_sum / total_weight
 
+
+def position_weight_matrix(positions):
+    '''
+    POSITION_WEIGHTS as a (len(positions), 6) array in PARAMS order, with
+    each row normalised to sum to 1. Positions without weights get equal
+    weights.
+    '''
+    weights = pd.DataFrame(POSITION_WEIGHTS).T.reindex(index=positions, columns=PARAMS).fillna(1.0)
+    weights = weights.to_numpy(dtype=np.float64)
+    return weights / weights.sum(axis=1, keepdims=True)
+
+
+def rank_improvement(prevSeason, currSeason, team=None):
+    '''
+    Rank season-over-season improvement for every MLS player in one pass.
+
+    Percentiles for the whole league come from the per-position indexes,
+    the two seasons are joined on (player_id, general_position), and the
+    position-weighted percentile change is a row-wise product with the
+    POSITION_WEIGHTS matrix.
+
+    Args:
+        prevSeason: String, earlier season
+        currSeason: String, later season
+        team: optional team abbreviation (e.g. 'POR'); only players on that
+            team in both seasons are ranked
+
+    Returns:
+        dataframe sorted by improvement_score, same columns as
+        find_most_improved_players
+    '''
+    data_prev = get_data(prevSeason)
+    data_curr = get_data(currSeason)
+
+    # Step 1: Candidate positions for each player in each season
+    pairs_prev = data_prev[['player_id', 'player_name', 'general_position', 'team_id']].drop_duplicates()
+    pairs_curr = data_curr[['player_id', 'general_position', 'team_id']].drop_duplicates()
+    if team is not None:
+        team_ids = REFERENCE.team_ids(team)
+        pairs_prev = pairs_prev[pairs_prev['team_id'].isin(team_ids)]
+        pairs_curr = pairs_curr[pairs_curr['team_id'].isin(team_ids)]
+    pairs_prev = pairs_prev.drop(columns='team_id').drop_duplicates()
+    pairs_curr = pairs_curr.drop(columns='team_id').drop_duplicates()
+
+    # Step 2: Positions played in both seasons; preferred position first,
+    # otherwise the alphabetically first shared one
+    shared = pd.merge(pairs_prev, pairs_curr, on=['player_id', 'general_position'])
+    shared['preferred'] = shared['player_id'].astype(object).map(preferred_positions()) == shared['general_position']
+    shared = shared.sort_values(['player_id', 'preferred', 'general_position'], ascending=[True, False, True])
+    shared = shared.drop_duplicates('player_id')
+
+    # Step 3: League-wide percentiles for both seasons, aligned on the join
+    key = ['player_id', 'general_position']
+    pct_prev = league_percentiles(data_prev).reset_index().set_index(key)[PARAMS]
+    pct_curr = league_percentiles(data_curr).reset_index().set_index(key)[PARAMS]
+    joined = shared.set_index(key)[['player_name']]
+    joined = joined.join(pct_prev, how='inner').join(pct_curr, how='inner', lsuffix='_prev', rsuffix='_curr')
+
+    prev_cols = [f"{param}_prev" for param in PARAMS]
+    curr_cols = [f"{param}_curr" for param in PARAMS]
+    joined = joined.dropna(subset=prev_cols + curr_cols)
+
+    # Step 4: Weighted percentile change as a matrix product
+    p_prev = joined[prev_cols].to_numpy()
+    p_curr = joined[curr_cols].to_numpy()
+    positions = joined.index.get_level_values('general_position')
+    weights = position_weight_matrix(positions)
+    improvement = np.einsum('ij,ij->i', p_curr - p_prev, weights)
+
+    df = pd.DataFrame({
+        "player_id": joined.index.get_level_values('player_id'),
+        "player_name": joined['player_name'].to_numpy(),
+        "position": positions,
+        f"{currSeason}_percentiles": p_curr.tolist(),
+        f"{prevSeason}_percentiles": p_prev.tolist(),
+        "improvement_score": improvement,
+    })
+    return df.sort_values(by="improvement_score", ascending=False).reset_index(drop=True)
+
+
 def find_most_improved_players(prevSeason,currSeason):
-    asa = AmericanSoccerAnalysis()
     print("Fetching data for both seasons...")
-    team_data = asa.get_teams(leagues=["mls"])
+    team_abbreviations = REFERENCE.team_abbreviations()
 
     data_prev = get_data(prevSeason)
     data_curr = get_data(currSeason)
-    data_prev = pd.merge(data_prev, team_data, on='team_id', how='left')
-    data_curr = pd.merge(data_curr, team_data, on='team_id', how='left')
+    data_prev = data_prev.assign(team_abbreviation=data_prev['team_id'].map(team_abbreviations))
+    data_curr = data_curr.assign(team_abbreviation=data_curr['team_id'].map(team_abbreviations))
 
 
     timbers_prev = data_prev[data_prev['team_abbreviation'] == ('POR')]
     timbers_curr = data_curr[data_curr['team_abbreviation'] == ('POR')]
 
-    # Get all unique Timbers players who appear in both seasons
-    players_prev = set(timbers_prev['player_name'].unique())
-    players_curr = set(timbers_curr['player_name'].unique())
-    common_players = list(players_prev & players_curr)
+    # Get all unique Timbers players who appear in both seasons, matched on
+    # ASA player_id so a respelled name doesn't drop a player
+    players_prev = set(timbers_prev['player_id'].astype(object).unique())
+    players_curr = set(timbers_curr['player_id'].astype(object).unique())
+    common_players = sorted(players_prev & players_curr)
 
     print(f"Found {len(common_players)} players with data in both seasons...")
 
     improvement_scores = []
+    preferred_by_id = preferred_positions()
+
+    # Group once so each player's rows are a lookup rather than a full scan
+    prev_groups = timbers_prev.groupby('player_id', sort=False, observed=True)
+    curr_groups = timbers_curr.groupby('player_id', sort=False, observed=True)
 
-    for player in common_players:
+    for player_id in common_players:
+        player = player_id
         try:
-            prev_rows = timbers_prev[timbers_prev['player_name'] == player]
-            curr_rows = timbers_curr[timbers_curr['player_name'] == player]
-            pos_prev, pos_curr = resolve_comparable_position(player, prev_rows, curr_rows)
+            prev_rows = prev_groups.get_group(player_id)
+            curr_rows = curr_groups.get_group(player_id)
+            # The current season's spelling is the one charted
+            player = curr_rows['player_name'].iloc[0]
+            pos_prev, pos_curr = resolve_comparable_position(player_id, prev_rows, curr_rows, preferred_by_id)
 
             # Sanity check to ensure we're comparing same position
             if pos_prev != pos_curr:
@@ -169,13 +242,13 @@ def find_most_improved_players(prevSeason,currSeason):
 
             p_curr = calculate_percentiles_with_fallback(
                 data_curr,
-                player_name=player,
                 position=pos_curr,
+                player_id=player_id,
             )
             p_prev = calculate_percentiles_with_fallback(
                 data_prev,
-                player_name=player,
                 position=pos_prev,
+                player_id=player_id,
             )
 
             if len(p_curr) != 6 or len(p_prev) != 6:
@@ -188,6 +261,7 @@ def find_most_improved_players(prevSeason,currSeason):
                 pos_curr,
             )
             improvement_scores.append({
+                "player_id": player_id,
                 "player_name": player,
                 "position": pos_curr,
                 f"{currSeason}_percentiles": p_curr,
@@ -208,9 +282,19 @@ def find_most_improved_players(prevSeason,currSeason):
     return df
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank season-over-season g+ percentile improvement")
+    parser.add_argument("prev_season", nargs="?", default="2025")
+    parser.add_argument("curr_season", nargs="?", default="2026")
+    parser.add_argument("--league", action="store_true",
+                        help="rank every MLS player in one pass instead of the Timbers roster")
+    parser.add_argument("--team", default=None, help="with --league, only this team abbreviation, e.g. POR")
+    parser.add_argument("--top", type=int, default=None, help="only print the top N")
+    args = parser.parse_args()
+
     # Run improvement analysis
-    most_improved_df = find_most_improved_players("2025","2026")
+    if args.league:
+        most_improved_df = rank_improvement(args.prev_season, args.curr_season, team=args.team)
+    else:
+        most_improved_df = find_most_improved_players(args.prev_season, args.curr_season)
 
-    # Optional: Visualize the most improved player
-    top_player = most_improved_df.iloc[0]
-    print(most_improved_df)
+    print(most_improved_df.head(args.top) if args.top is not None else most_improved_df)
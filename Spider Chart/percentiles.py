@@ -0,0 +1,161 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from action_matrix import PARAMS, get_action_matrix
+
+# Columns a PercentileIndex reads, for column-projected loads
+INDEX_COLUMNS = ['player_id', 'player_name', 'general_position', 'team_id', 'action_type',
+                 'minutes_played', 'goals_added_raw_per90']
+
+# Early-season data often has no positional peers above 800 minutes,
+# so the fallback relaxes the threshold until a usable comparison pool exists.
+FALLBACK_MINUTES = (800, 400, 180, 90, 0)
+MIN_POOL_PLAYERS = 10
+
+_INDEX_CACHE = {}
+
+
+def rank_percentiles(sorted_pool, scores):
+    '''
+    Vectorized scipy.stats.percentileofscore(pool, score, kind='rank') for a
+    pre-sorted pool, using two binary searches per score.
+    '''
+    n = len(sorted_pool)
+    scores = np.asarray(scores, dtype=np.float64)
+    if n == 0:
+        return np.full(scores.shape, np.nan)
+    left = np.searchsorted(sorted_pool, scores, side='left')
+    right = np.searchsorted(sorted_pool, scores, side='right')
+    plus1 = left < right
+    result = (left + right + plus1) * (50.0 / n)
+    return np.where(np.isnan(scores), np.nan, result)
+
+
+class PercentileIndex:
+    '''
+    Sorted per-action g+ per 90 arrays for one position's comparison pool
+    (players at the position above a minutes threshold), plus every
+    position player's own per 90 values, so any player's six percentiles
+    are a binary search away. Both are slices of the season's ActionMatrix.
+    '''
+
+    def __init__(self, grouped_data, position, min_minutes, value_col='goals_added_raw_per90'):
+        self.position = position
+        self.min_minutes = min_minutes
+        self.value_col = value_col
+
+        matrix = get_action_matrix(grouped_data, value_col)
+        pool_rows = matrix.pool_rows(position, min_minutes)
+        pool = matrix.values[pool_rows]
+        self.pool_players = len(np.unique(matrix.player_id[pool_rows]))
+
+        self.sorted_values = {}
+        for j, param in enumerate(PARAMS):
+            column = pool[:, j]
+            self.sorted_values[param] = np.sort(column[~np.isnan(column)])
+
+        # One row per player at the position, one column per action type
+        rows = matrix.player_rows(matrix.position_rows(position))
+        self.players = pd.DataFrame(matrix.values[rows], columns=PARAMS,
+                                    index=pd.Index(matrix.player_id[rows], name='player_id'))
+        self.players.insert(0, 'player_name', matrix.player_name[rows])
+
+    def query(self, values):
+        '''
+        Percentiles for an (n, 6) array of per 90 values in PARAMS order.
+        '''
+        values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+        out = np.empty(values.shape)
+        for j, param in enumerate(PARAMS):
+            out[:, j] = rank_percentiles(self.sorted_values.get(param, np.empty(0)), values[:, j])
+        return out
+
+    def percentiles(self, player_name=None, player_id=None):
+        '''
+        The six percentiles for one player, by ASA player_id or by display
+        name, or [] if the player (or any of their action types, or the
+        comparison pool) is missing.
+        '''
+        if player_id is not None:
+            rows = self.players[self.players.index == player_id]
+        else:
+            rows = self.players[self.players['player_name'] == player_name]
+        if rows.empty:
+            return []
+        values = rows[PARAMS].to_numpy(dtype=np.float64)[0]
+        result = self.query(values)[0]
+        if np.isnan(result).any():
+            return []
+        return [float(p) for p in result]
+
+    def table(self, player_names=None):
+        '''
+        Percentiles for every player at the position (or just the given
+        roster), one row per player.
+        '''
+        players = self.players
+        if player_names is not None:
+            players = players[players['player_name'].isin(player_names)]
+        result = pd.DataFrame(self.query(players[PARAMS].to_numpy(dtype=np.float64)),
+                              index=players.index, columns=PARAMS)
+        result.insert(0, 'player_name', players['player_name'])
+        result.insert(1, 'general_position', self.position)
+        return result
+
+
+def get_percentile_index(grouped_data, position, min_minutes, value_col='goals_added_raw_per90'):
+    '''
+    Build (or reuse) the PercentileIndex for a season frame, position and
+    minutes threshold. Indexes are cached for as long as the frame lives.
+    '''
+    key = (id(grouped_data), position, min_minutes, value_col)
+    cached = _INDEX_CACHE.get(key)
+    if cached is not None and cached[0]() is grouped_data:
+        return cached[1]
+
+    index = PercentileIndex(grouped_data, position, min_minutes, value_col)
+    _INDEX_CACHE[key] = (weakref.ref(grouped_data, lambda _: _INDEX_CACHE.pop(key, None)), index)
+    return index
+
+
+def get_fallback_index(grouped_data, position, value_col='goals_added_raw_per90'):
+    '''
+    The PercentileIndex at the strictest minutes threshold in
+    FALLBACK_MINUTES that still leaves MIN_POOL_PLAYERS peers.
+    '''
+    for min_minutes in FALLBACK_MINUTES:
+        index = get_percentile_index(grouped_data, position, min_minutes, value_col)
+        if index.pool_players >= MIN_POOL_PLAYERS or min_minutes == 0:
+            return index
+
+
+def league_percentiles(grouped_data, min_minutes=None, positions=None, value_col='goals_added_raw_per90'):
+    '''
+    Percentiles for every player in the league against their positional
+    peers, for leaderboards.
+
+    Args:
+        grouped_data: season frame from get_data
+        min_minutes: minutes threshold for the comparison pools, or None to
+            use the FALLBACK_MINUTES search per position
+        positions: optional list of positions, defaults to all of them
+        value_col: String, the per 90 column to rank
+
+    Returns:
+        dataframe indexed by player_id with player_name, general_position
+        and one percentile column per action type
+    '''
+    if positions is None:
+        positions = sorted(grouped_data['general_position'].dropna().unique())
+
+    tables = []
+    for position in positions:
+        if min_minutes is None:
+            index = get_fallback_index(grouped_data, position, value_col)
+        else:
+            index = get_percentile_index(grouped_data, position, min_minutes, value_col)
+        tables.append(index.table())
+
+    return pd.concat(tables)
@@ -0,0 +1,104 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from timbers.fonts import get_font
+
+
+def radar_outpath(player_name, season, second_season=None, output_dir="Output"):
+    new_name_arr = player_name.split(' ')
+    if len(new_name_arr) > 1:
+        new_name = new_name_arr[0] + new_name_arr[1]
+    else:
+        new_name = new_name_arr[0]
+    if second_season is not None:
+        return f"{output_dir}/{new_name}_{season}_vs_{second_season}_spiderchart.png"
+    return f"{output_dir}/{new_name}_{season}_spiderchart.png"
+
+def draw_radar_chart(percentile,player_name,position_name,team_name,season,compare = False,second_percentile = None, second_season = None, outpath = None, dpi = 300):
+    from mplsoccer import Radar, grid
+    import matplotlib.pyplot as plt
+    from matplotlib.patches import Patch
+
+    # Parsed once per process from Fonts/
+    serif_regular = get_font('SourceSerifPro-Regular')
+    robotto_thin = get_font('Roboto-Thin')
+    robotto_bold = get_font('RobotoSlab-Regular')
+
+    # Example stat names
+    params = ['Dribbling','Fouling','Interrupting','Passing','Receiving','Shooting']
+
+
+    # Define min-max ranges (all percentiles here)
+    low = [0] * len(params)
+    high = [100] * len(params)
+
+    round_int = [True] * len(params)
+    lower_is_better = None
+
+    # Radar setup exactly like docs
+    radar = Radar(params, low, high,
+                lower_is_better=lower_is_better,
+                # whether to round any of the labels to integers instead of decimal places
+                round_int=round_int,
+                num_rings=4,  # the number of concentric circles (excluding center circle)
+                # if the ring_width is more than the center_circle_radius then
+                # the center circle radius will be wider than the width of the concentric circles
+                ring_width=1, center_circle_radius=1)
+
+    # creating the figure using the grid function from mplsoccer:
+    fig, ax = grid(figheight=14, grid_height=0.915, title_height=0.06, endnote_height=0.025,
+                    title_space=0, endnote_space=0, grid_key='radar', axis=False)
+
+    # plot the radar
+    radar.setup_axis(ax=ax['radar'])
+
+    rings_inner = radar.draw_circles(ax=ax['radar'], facecolor="#FFBE27", edgecolor='#FFBE27')
+    legend_handles = [Patch(color="#175922", label=season)]
+
+    if compare and second_percentile is not None:
+        second_radar_output = radar.draw_radar(second_percentile, ax=ax['radar'],
+                                               kwargs_radar={'facecolor': "#8A0F17", 'alpha': 0.8},
+                                               kwargs_rings={'facecolor': "#65100B", 'alpha': 0.8})
+        legend_handles.append(Patch(color="#8A0F17", label=second_season))
+
+    radar_output = radar.draw_radar(percentile, ax=ax['radar'],
+                                    kwargs_radar={'facecolor': "#175922",'alpha': 0.7 if compare else 1},
+                                    kwargs_rings={'facecolor': "#143A18",'alpha': 0.7 if compare else 1})
+    
+
+    
+
+    radar_poly, rings_outer, vertices = radar_output
+    range_labels = radar.draw_range_labels(ax=ax['radar'], fontsize=25,
+                                        fontproperties=serif_regular)
+    param_labels = radar.draw_param_labels(ax=ax['radar'], fontsize=25,
+                                        fontproperties=serif_regular)
+    
+    # Add legend
+    ax['radar'].legend(handles=legend_handles, loc='upper right', fontsize=18, 
+                       frameon=True,bbox_to_anchor=(1, 0.99))  # (x, y) where y < 1 moves it down
+
+
+    # adding the endnote and title text (these axes range from 0-1, i.e. 0, 0 is the bottom left)
+    # Note we are slightly offsetting the text from the edges by 0.01 (1%, e.g. 0.99)
+    endnote_text = ax['endnote'].text(0.99, 0.5, 'Made by TotalTimbers - Statistics via American Soccer Analysis - Percentiles Based on G+ of Positional Peers with >800 Minutes this Season', fontsize=15,
+                                    fontproperties=robotto_thin, ha='right', va='center')
+    title1_text = ax['title'].text(0.01, 0.6, player_name, fontsize=40,
+                                    fontproperties=robotto_bold, ha='left', va='center')
+    title2_text = ax['title'].text(0.01, 0.05, team_name, fontsize=25,
+                                    fontproperties=robotto_thin,
+                                    ha='left', va='center', color="#104618")
+    title3_text = ax['title'].text(0.99, 0.6, 'Radar Chart', fontsize=40,
+                                    fontproperties=robotto_bold, ha='right', va='center')
+    title4_text = ax['title'].text(0.99, 0.05, position_name, fontsize=25,
+                                    fontproperties=robotto_thin,
+                                    ha='right', va='center', color='#104618')
+    
+    if outpath is None:
+        outpath = radar_outpath(player_name, season, second_season if compare else None)
+    os.makedirs(os.path.dirname(outpath) or '.', exist_ok=True)
+
+    plt.savefig(outpath, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    return outpath
@@ -0,0 +1,352 @@
+'''
+Rolling per 90 goals-added form, per player and action type, from the
+game-split g+ data in the SeasonStore.
+
+Each player's last `window` games are kept in memory, so when a matchday
+lands only its player-games are processed: the oldest game drops out of
+each window, the new one goes in, and one rolling row per player-game is
+appended. The per-game matrix and the rolling series are saved under
+Cache Data/form, and a refresh reads only the game files not yet seen.
+
+Position groups come back as aligned (players x matchdays x actions)
+arrays with NaN where a player didn't play, ready to draw one line per
+player.
+
+Example:
+    python rolling_form.py --season 2025 --positions CB --team POR --window 5
+'''
+import argparse
+import json
+import os
+import sys
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import requests
+
+from action_matrix import PARAMS
+from season_data import CACHE_DIR
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from timbers.asa import get_fetcher
+from timbers.cache import atomic_write_json, atomic_write_parquet
+from timbers.reference import REFERENCE
+from timbers.season_store import SeasonStore
+
+FORM_DIR = os.path.join(CACHE_DIR, "form")
+GAME_KEYS = ['player_id', 'game_id', 'game_date', 'general_position', 'team_id']
+
+
+def game_matrix(rows, value_col='goals_added_raw'):
+    '''
+    Per-action rows to one row per player-game, with one column per action
+    type in PARAMS order and the minutes played, in kickoff order.
+    '''
+    keys = rows[GAME_KEYS].astype(object).assign(action_type=rows['action_type'].astype(object))
+    values = rows[value_col].astype('float64')
+    wide = values.groupby([keys[col] for col in keys.columns], dropna=False).sum().unstack('action_type')
+    # An action type with no row in a game added nothing
+    wide = wide.reindex(columns=PARAMS).fillna(0.0)
+    wide.columns = list(PARAMS)
+
+    minutes = rows['minutes_played'].astype('float64').groupby([keys[col] for col in GAME_KEYS], dropna=False).first()
+    wide['minutes'] = minutes.reindex(wide.index).to_numpy()
+    return wide.reset_index().sort_values(['game_date', 'game_id'], kind='stable').reset_index(drop=True)
+
+
+class FormPanel:
+    '''
+    Rolling form of a group of players on a shared matchday axis.
+
+    Attributes:
+        player_id: (n,) array
+        dates: (m,) array of game dates, every date any of them played
+        values: (n, m, 6) rolling per 90 values in PARAMS order, NaN where
+            the player didn't play that day
+        minutes: (n, m) minutes in each rolling window
+        window: number of games per window
+    '''
+
+    def __init__(self, player_id, dates, values, minutes, window):
+        self.player_id = player_id
+        self.dates = dates
+        self.values = values
+        self.minutes = minutes
+        self.window = window
+
+    def __len__(self):
+        return len(self.player_id)
+
+    def action(self, name=None):
+        '''
+        (n, m) rolling per 90 values of one action type, or of all of them
+        summed (total g+) when name is None.
+        '''
+        if name is None:
+            # Every action is NaN together on days the player didn't play
+            return self.values.sum(axis=2)
+        return self.values[:, :, PARAMS.index(name)]
+
+    def frame(self):
+        '''
+        The panel as a long dataframe, one row per player and matchday played.
+        '''
+        players, days = np.nonzero(~np.isnan(self.minutes))
+        frame = pd.DataFrame(self.values[players, days], columns=PARAMS)
+        frame.insert(0, 'player_id', self.player_id[players])
+        frame.insert(1, 'game_date', self.dates[days])
+        frame['window_minutes'] = self.minutes[players, days]
+        return frame
+
+
+class RollingForm:
+    '''
+    Incrementally maintained rolling per 90 form for one season.
+
+    Args:
+        season: String, season
+        window: number of most recent games per rolling window
+        value_col: String, the g+ column to roll
+        root: String, where the per-game matrix and series are saved
+    '''
+
+    def __init__(self, season, window=5, value_col='goals_added_raw', root=FORM_DIR):
+        self.season = str(season)
+        self.window = window
+        self.value_col = value_col
+        self.path = os.path.join(root, f"{self.season}_{value_col}_w{window}")
+        self.games = pd.DataFrame(columns=GAME_KEYS + PARAMS + ['minutes'])
+        self.series = pd.DataFrame(columns=GAME_KEYS + PARAMS + ['window_minutes'])
+        self.high_water_mark = None
+        self._windows = {}
+        self._load()
+
+    @property
+    def game_ids(self):
+        return set(self.games['game_id'].astype(str))
+
+    def _load(self):
+        state_path = os.path.join(self.path, "state.json")
+        if not os.path.exists(state_path):
+            return
+        with open(state_path) as f:
+            self.high_water_mark = json.load(f)['high_water_mark']
+        self.games = pd.read_parquet(os.path.join(self.path, "games.parquet"))
+        self.series = pd.read_parquet(os.path.join(self.path, "series.parquet"))
+        self._reset_windows(self.games)
+
+    def _reset_windows(self, games):
+        # Each player's last `window` games, oldest first
+        self._windows = {}
+        recent = games.groupby('player_id', sort=False).tail(self.window)
+        values = recent[PARAMS].to_numpy(dtype=np.float64)
+        minutes = recent['minutes'].to_numpy(dtype=np.float64)
+        for i, player in enumerate(recent['player_id'].to_numpy()):
+            window = self._windows.setdefault(player, deque(maxlen=self.window))
+            window.append((values[i], minutes[i]))
+
+    def _roll(self, wide):
+        '''
+        Push player-games (in kickoff order) through the windows.
+
+        Returns:
+            the rolling rows for them
+        '''
+        values = wide[PARAMS].to_numpy(dtype=np.float64)
+        minutes = wide['minutes'].to_numpy(dtype=np.float64)
+        rolled = np.full_like(values, np.nan)
+        window_minutes = np.empty(len(wide))
+
+        for i, player in enumerate(wide['player_id'].to_numpy()):
+            window = self._windows.get(player)
+            if window is None:
+                window = self._windows[player] = deque(maxlen=self.window)
+            # The deque drops the oldest game once it's full
+            window.append((values[i], minutes[i]))
+            total_minutes = sum(m for _, m in window)
+            window_minutes[i] = total_minutes
+            if total_minutes > 0:
+                rolled[i] = np.sum([v for v, _ in window], axis=0) * 90 / total_minutes
+
+        series = wide[GAME_KEYS].copy()
+        series[PARAMS] = rolled
+        series['window_minutes'] = window_minutes
+        return series
+
+    def update(self, game_rows):
+        '''
+        Fold new games' per-action rows into the rolling form. Games already
+        seen are ignored. A game older than the latest one processed (a late
+        correction) rebuilds the season from the stored per-game matrix.
+
+        Args:
+            game_rows: per-action rows as stored by SeasonStore
+
+        Returns:
+            Number of new games
+        '''
+        if game_rows.empty:
+            return 0
+        new = game_rows[~game_rows['game_id'].astype(str).isin(self.game_ids)]
+        if new.empty:
+            return 0
+
+        wide = game_matrix(new, self.value_col)
+        wide['game_id'] = wide['game_id'].astype(str)
+
+        if self.high_water_mark is not None and wide['game_date'].min() < self.high_water_mark:
+            games = pd.concat([self.games, wide], ignore_index=True)
+            games = games.sort_values(['game_date', 'game_id'], kind='stable').reset_index(drop=True)
+            self._windows = {}
+            self.games, self.series = games, self._roll(games)
+        else:
+            self.games = pd.concat([self.games, wide], ignore_index=True) if len(self.games) else wide
+            series = self._roll(wide)
+            self.series = pd.concat([self.series, series], ignore_index=True) if len(self.series) else series
+
+        self.high_water_mark = self.games['game_date'].max()
+        return wide['game_id'].nunique()
+
+    def refresh(self, store):
+        '''
+        Read only the SeasonStore games not processed yet, fold them in and
+        save.
+
+        Returns:
+            Number of new games
+        '''
+        new_games = self.update(store.load_games(exclude_games=self.game_ids))
+        if new_games:
+            self.save()
+        return new_games
+
+    def save(self):
+        atomic_write_parquet(self.games, os.path.join(self.path, "games.parquet"), index=False)
+        atomic_write_parquet(self.series, os.path.join(self.path, "series.parquet"), index=False)
+        atomic_write_json({'high_water_mark': self.high_water_mark, 'window': self.window,
+                           'value_col': self.value_col}, os.path.join(self.path, "state.json"))
+
+    def panel(self, positions=None, team_ids=None, players=None, ffill=False):
+        '''
+        Rolling form of a group of players as aligned arrays.
+
+        Args:
+            positions: optional list of general positions; players are
+                grouped by the position they played most this season
+            team_ids: optional set of team ids the players' games were for
+            players: optional list of player ids
+            ffill: Boolean, carry each player's form across games they
+                missed instead of leaving NaN
+
+        Returns:
+            FormPanel
+        '''
+        series = self.series
+        if team_ids is not None:
+            series = series[series['team_id'].isin(team_ids)]
+        if positions is not None:
+            usual = series.groupby(['player_id', 'general_position'], dropna=False).size().reset_index(name='games')
+            usual = usual.sort_values(['player_id', 'games'], ascending=[True, False]).drop_duplicates('player_id')
+            series = series[series['player_id'].isin(usual.loc[usual['general_position'].isin(positions), 'player_id'])]
+        if players is not None:
+            series = series[series['player_id'].isin(players)]
+
+        # Step 1: Shared axes
+        player_id = pd.unique(series['player_id'].to_numpy())
+        dates = np.sort(series['game_date'].unique())
+        rows = pd.Index(player_id).get_indexer(series['player_id'])
+        days = np.searchsorted(dates, series['game_date'].to_numpy())
+
+        # Step 2: Scatter the rolling rows into the arrays
+        values = np.full((len(player_id), len(dates), len(PARAMS)), np.nan)
+        minutes = np.full((len(player_id), len(dates)), np.nan)
+        values[rows, days] = series[PARAMS].to_numpy(dtype=np.float64)
+        minutes[rows, days] = series['window_minutes'].to_numpy(dtype=np.float64)
+
+        if ffill and len(dates):
+            # Index of each player's latest game on or before every day
+            last = np.where(~np.isnan(minutes), np.arange(len(dates)), 0)
+            last = np.maximum.accumulate(last, axis=1)
+            values = values[np.arange(len(player_id))[:, None], last]
+            minutes = minutes[np.arange(len(player_id))[:, None], last]
+
+        return FormPanel(player_id, dates, values, minutes, self.window)
+
+
+def plot_panel(panel, names=None, action=None, title="Rolling G+ per 90", outpath=None):
+    '''
+    One line per player across the panel's matchdays, in the style of the
+    Centerbacks time series charts.
+
+    Args:
+        panel: FormPanel
+        names: optional Series of player_id -> player_name
+        action: optional action type, defaults to total g+
+        title: String, chart title
+        outpath: String, where to save the PNG; shown if None
+    '''
+    import matplotlib.pyplot as plt
+    from timbers.fonts import get_font
+
+    font_props = get_font('Arvo-Bold')
+    values = panel.action(action)
+    dates = pd.to_datetime(panel.dates)
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    fig.patch.set_facecolor('#1a1a1a')
+    ax.set_facecolor('#1a1a1a')
+
+    for i, player in enumerate(panel.player_id):
+        label = names.get(player, player) if names is not None else player
+        played = ~np.isnan(values[i])
+        ax.plot(dates[played], values[i][played], marker='o', linewidth=2, label=label)
+
+    ax.axhline(0, color='grey', linestyle='--', linewidth=1)
+    ax.set_xticks(dates)
+    ax.set_xticklabels(dates.strftime('%b %d, %Y'), rotation=45, ha='right', fontproperties=font_props, color='white')
+    ax.tick_params(colors='white')
+    ax.grid(alpha=0.3)
+    ax.set_xlabel("Date", fontproperties=font_props, color='white')
+    ax.set_ylabel(f"G+ per 90 (last {panel.window} games)", fontproperties=font_props, color='white')
+    ax.set_title(title, fontproperties=font_props, fontsize=24, color='white')
+    ax.legend(facecolor='#1a1a1a', labelcolor='white', prop=font_props)
+    plt.tight_layout()
+
+    if outpath is None:
+        plt.show()
+    else:
+        os.makedirs(os.path.dirname(outpath) or '.', exist_ok=True)
+        plt.savefig(outpath)
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rolling per 90 g+ form for a position group")
+    parser.add_argument("--season", default='2025')
+    parser.add_argument("--positions", nargs="+", default=['CB'])
+    parser.add_argument("--team", default='POR', help="team abbreviation, or 'all'")
+    parser.add_argument("--window", type=int, default=5)
+    parser.add_argument("--action", default=None, help="one action type instead of total g+")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    # Step 1: Pull any new games into the game store
+    store = SeasonStore(args.season, root=os.path.join(CACHE_DIR, "games"))
+    try:
+        store.refresh(get_fetcher())
+    except requests.exceptions.RequestException as e:
+        print(f"Could not refresh {args.season} games ({e}), using stored games")
+
+    # Step 2: Roll only the games not seen before
+    form = RollingForm(args.season, window=args.window)
+    print(f"{form.refresh(store)} new games")
+
+    # Step 3: Draw the group
+    team_ids = REFERENCE.team_ids(args.team) if args.team != 'all' else None
+    panel = form.panel(args.positions, team_ids=team_ids)
+    group = '_'.join(args.positions)
+    outpath = args.output or os.path.join("Output", f"{group}_{args.season}_rolling_form.png")
+    plot_panel(panel, names=REFERENCE.player_names(), action=args.action,
+               title=f"{args.team} {group} Rolling G+ per 90 ({args.season})", outpath=outpath)
+    print(f"Wrote {outpath}")
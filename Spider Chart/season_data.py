@@ -0,0 +1,91 @@
+'''
+Season g+ frames for the spider chart scripts, served from the partitioned
+dataset in Cache Data/gplus and refreshed from ASA when stale.
+
+Only pandas, pyarrow and requests are needed here; the plotting libraries
+live in radar.py and are imported when a chart is drawn.
+'''
+import os
+import sys
+
+import requests
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from timbers.asa import get_fetcher
+from timbers.gplus_dataset import GplusDataset, season_key
+from timbers.season_store import GPLUS_COLUMNS, GPLUS_SCHEMA_VERSION, SeasonStore
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Cache Data")
+GPLUS = GplusDataset(os.path.join(CACHE_DIR, "gplus"))
+
+
+def _gplus_params(season_name):
+    return {'leagues': ['mls'], 'season_name': str(season_name), 'split_by_games': True}
+
+
+def _position_filters(positions):
+    return [('general_position', 'in', list(positions))] if positions is not None else None
+
+
+def get_data(season_name='2025', use_cache=True, positions=None, columns=None):
+    # Seasons cached by older versions as one whole file are moved into the
+    # dataset, and past seasons stored without a manifest entry are adopted
+    GPLUS.migrate_legacy(CACHE_DIR)
+    GPLUS.adopt_past_seasons(_gplus_params, GPLUS_SCHEMA_VERSION, GPLUS_COLUMNS)
+
+    key = season_key(season_name)
+    params = _gplus_params(season_name)
+    filters = _position_filters(positions)
+    if use_cache:
+        # Only the requested positions' files and columns are read
+        grouped_data = GPLUS.read(key, params, GPLUS_SCHEMA_VERSION, columns=columns, filters=filters)
+        if grouped_data is not None:
+            return grouped_data
+
+    try:
+        # Pull only the games played since the last refresh into the
+        # game-partitioned store, and fold them into the running sums
+        store = SeasonStore(season_name, root=os.path.join(CACHE_DIR, "games"))
+        store.refresh(get_fetcher())
+
+        # Sums, per 90 values and player names/positions/teams; names come
+        # from the daily reference table, refetched for new signings
+        grouped_data = store.grouped()
+    except requests.exceptions.RequestException as e:
+        # Offline: an expired copy beats no chart at all
+        grouped_data = GPLUS.read(key, params, GPLUS_SCHEMA_VERSION, columns=columns, filters=filters,
+                                  allow_stale=True)
+        if grouped_data is None:
+            raise
+        print(f"Could not refresh {season_name} g+ data ({e}), using cached copy")
+        return grouped_data
+
+    GPLUS.write(key, grouped_data, params, GPLUS_SCHEMA_VERSION, season=season_name)
+    if positions is not None:
+        grouped_data = grouped_data[grouped_data['general_position'].isin(positions)].reset_index(drop=True)
+    if columns is not None:
+        grouped_data = grouped_data[columns]
+    return grouped_data
+
+def get_history(seasons=None, positions=None, columns=None, filters=None):
+    '''
+    Rows from several seasons at once (e.g. for career trajectories), read
+    straight from the partitioned dataset.
+
+    Args:
+        seasons: optional list of seasons; any that are missing or stale are
+            refreshed first. Defaults to every stored season, as stored.
+        positions: optional list of general positions
+        columns: optional list of columns, 'season' included
+        filters: optional pyarrow-style row filters, e.g.
+            [('player_id', 'in', ids)]
+
+    Returns:
+        dataframe with a season column
+    '''
+    GPLUS.migrate_legacy(CACHE_DIR)
+    GPLUS.adopt_past_seasons(_gplus_params, GPLUS_SCHEMA_VERSION, GPLUS_COLUMNS)
+    for season in seasons or []:
+        if not GPLUS.is_current(season_key(season), _gplus_params(season), GPLUS_SCHEMA_VERSION):
+            get_data(season)
+    return GPLUS.query(seasons, positions, columns, filters)
@@ -0,0 +1,162 @@
+'''
+Top-k similar players by per 90 goals-added action profile.
+
+Every (season, player, position) profile from the requested seasons is
+stacked into one matrix per position, with each action column standardised
+against that position's players. A query is a weighted Euclidean distance
+to every candidate at the position, optionally with POSITION_WEIGHTS,
+computed for a whole roster at once as one matrix product.
+
+Example:
+    python similarity.py "Kevin Kelsy" --position ST --season 2025 -k 5
+'''
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from action_matrix import PARAMS, get_action_matrix
+from mostimproved import position_weight_matrix
+from season_data import get_data
+
+
+class SimilarityIndex:
+    '''
+    Standardised action profiles for several seasons, grouped by position.
+
+    Args:
+        season_frames: dict of season -> grouped frame from get_data
+        min_minutes: minutes a player needs to be returned as a match;
+            anyone can still be the query player
+        value_col: String, the per 90 column to compare
+    '''
+
+    def __init__(self, season_frames, min_minutes=450, value_col='goals_added_raw_per90'):
+        self.min_minutes = min_minutes
+
+        # Step 1: One row per season, player and position
+        parts = []
+        for season, grouped_data in season_frames.items():
+            matrix = get_action_matrix(grouped_data, value_col)
+            # Players listed at several positions get one profile per
+            # position; traded players' per-team rows are identical
+            keys = pd.DataFrame({'player_id': matrix.player_id, 'general_position': matrix.general_position})
+            rows = np.flatnonzero(~keys.duplicated().to_numpy())
+            part = matrix.frame(rows)
+            part['season'] = str(season)
+            part['minutes'] = matrix.minutes[rows]
+            parts.append(part)
+        profiles = pd.concat(parts, ignore_index=True).dropna(subset=PARAMS + ['general_position'])
+
+        # Step 2: Standardise each position's columns against its own players
+        self.positions = {}
+        for position, block in profiles.groupby('general_position', sort=True):
+            values = block[PARAMS].to_numpy(dtype=np.float64)
+            mean = values.mean(axis=0)
+            std = values.std(axis=0)
+            std[std == 0] = 1.0
+            self.positions[position] = {
+                'meta': block[['player_id', 'player_name', 'season', 'minutes']].reset_index(drop=True),
+                'z': (values - mean) / std,
+                'weights': position_weight_matrix([position])[0],
+            }
+
+    def _lookup(self, position, player_name, season):
+        block = self.positions.get(position)
+        if block is None:
+            return None
+        meta = block['meta']
+        hits = np.flatnonzero((meta['player_name'].to_numpy() == player_name) & (meta['season'].to_numpy() == str(season)))
+        return hits[0] if len(hits) else None
+
+    def most_similar_many(self, players, position, season, k=10, weighted=True, seasons=None, exclude_self=True):
+        '''
+        Top-k matches for several players at one position in one batch.
+
+        Args:
+            players: list of player names
+            position: String, general position, e.g. 'ST'
+            season: String, season of the query players' profiles
+            k: number of matches per player
+            weighted: Boolean, weight the actions by POSITION_WEIGHTS
+            seasons: optional list of seasons to draw matches from
+            exclude_self: Boolean, leave the player's own profiles out
+
+        Returns:
+            long dataframe with query, rank, player_id, player_name, season,
+            minutes, distance and similarity (1 / (1 + distance)); players
+            without a profile at the position are left out
+        '''
+        block = self.positions.get(position)
+        if block is None:
+            return pd.DataFrame()
+        meta, z = block['meta'], block['z']
+
+        found = [(name, self._lookup(position, name, season)) for name in players]
+        found = [(name, row) for name, row in found if row is not None]
+        if not found:
+            return pd.DataFrame()
+        names = [name for name, _ in found]
+        query_rows = np.array([row for _, row in found])
+
+        # Step 1: Scale the columns so plain Euclidean distance is the weighted one
+        scale = np.sqrt(block['weights'] * len(PARAMS)) if weighted else np.ones(len(PARAMS))
+        candidates = z * scale
+        queries = candidates[query_rows]
+
+        # Step 2: All query-candidate squared distances in one product
+        sq = (queries ** 2).sum(axis=1)[:, None] + (candidates ** 2).sum(axis=1)[None, :] - 2 * queries @ candidates.T
+        dist = np.sqrt(np.maximum(sq, 0.0))
+
+        eligible = meta['minutes'].to_numpy() >= self.min_minutes
+        if seasons is not None:
+            eligible &= meta['season'].isin([str(s) for s in seasons]).to_numpy()
+        dist[:, ~eligible] = np.inf
+        if exclude_self:
+            query_ids = meta['player_id'].to_numpy()[query_rows]
+            dist[meta['player_id'].to_numpy()[None, :] == query_ids[:, None]] = np.inf
+
+        # Step 3: Top k per query without a full sort
+        k = min(k, int(eligible.sum()))
+        if k == 0:
+            return pd.DataFrame()
+        top = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        order = np.take_along_axis(dist, top, axis=1).argsort(axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_dist = np.take_along_axis(dist, top, axis=1)
+
+        result = meta.iloc[top.ravel()].reset_index(drop=True)
+        result.insert(0, 'query', np.repeat(names, k))
+        result.insert(1, 'rank', np.tile(np.arange(1, k + 1), len(names)))
+        result['distance'] = top_dist.ravel()
+        result['similarity'] = 1 / (1 + result['distance'])
+        return result[np.isfinite(result['distance'])].reset_index(drop=True)
+
+    def most_similar(self, player_name, position, season, k=10, weighted=True, seasons=None, exclude_self=True):
+        '''
+        Top-k players most similar to one player's profile at a position.
+        '''
+        result = self.most_similar_many([player_name], position, season, k, weighted, seasons, exclude_self)
+        return result.drop(columns=['query'], errors='ignore')
+
+
+def build_similarity_index(seasons, min_minutes=450):
+    '''
+    SimilarityIndex over get_data for each season.
+    '''
+    return SimilarityIndex({season: get_data(season) for season in seasons}, min_minutes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find the MLS players most similar to a player's g+ profile")
+    parser.add_argument("players", nargs="+")
+    parser.add_argument("--position", required=True)
+    parser.add_argument("--season", default='2025')
+    parser.add_argument("--seasons", nargs="+", default=['2023', '2024', '2025', '2026'])
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--unweighted", action="store_true")
+    args = parser.parse_args()
+
+    index = build_similarity_index(args.seasons)
+    print(index.most_similar_many(args.players, args.position, args.season, k=args.k,
+                                  weighted=not args.unweighted).to_string(index=False))
@@ -1,33 +1,26 @@
-import numpy as np
-import requests
-import pandas as pd
-from io import StringIO
+import os
+import sys
 import matplotlib.pyplot as plt
 
-url = "https://fbref.com/en/squads/d076914e/Portland-Timbers-Stats"
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+from timbers.fbref import fetch_html, squad_standard_stats, squad_url
+from timbers.identity import get_identity
 
-html_content = requests.get(url).text.replace('<!--','').replace('-->','')
+# Step 1: Fetch the squad page (cached on disk, revalidated after 6 hours)
 
-players_data = pd.read_html(StringIO(html_content))
+html_content = fetch_html(squad_url())
 
-players_data = players_data[0]
+# Step 2: Parse only the standard stats table; the second G+A is G+A_Per90
 
-players_data.columns = players_data.columns.droplevel(0)
+players_data, summary_data = squad_standard_stats(html_content)
 
-summary_data = players_data[30:]
+# Step 3: Attach ASA player ids, so the fbref table joins ASA data on ids
+# rather than on fbref's spelling of each name
 
-players_data = players_data[0:30]
-
-cols = players_data.columns.to_list()
-count = 0
-for i in range(len(cols)):
-    if cols[i] == 'G+A':
-        count += 1
-        if count == 2:  # Change only the SECOND occurrence
-            cols[i] = 'G+A_Per90'
-
-# Step 3: Assign the updated column names
-players_data.columns = cols
+players_data = get_identity().attach(players_data, 'Player')
+unmatched = players_data.loc[players_data['player_id'].isna(), 'Player'].tolist()
+if unmatched:
+    print(f"No ASA player found for: {', '.join(unmatched)}")
 
 #Now, lets plot some squad statistics.
 
@@ -39,24 +32,18 @@ plt.cla()
 
 # Filter out NAs
 
-players_data = players_data.dropna(axis = 0, how = 'any',subset = ["Min","G+A"])
-
-# Ensure 'Min' and 'G+A' are numeric
-
-players_data = players_data.astype({'Min':float,'G+A':float,'Player':str})
+players_data = players_data.dropna(axis = 0, how = 'any',subset = ["Min","G+A"]).reset_index(drop=True)
 
 # Use matplotlib to plot
 
 plt.plot(players_data['Min'], players_data['G+A'],color = 'blue',marker = 'o',linestyle = '',label='Data Points')
 
-#NEED TO FIGURE OUT TWO COLUMNS WITH SAME NAME
 print(players_data.loc[0,'G+A'])
 
-
-for i in range(27):
-  #print(players_data.loc[i,'G+A'])
-  if (players_data.loc[i,'G+A'] >= 13.0):  # Adjust as needed
-    plt.text(players_data.loc[i,'Min'], players_data.loc[i,'G+A'], players_data.loc[i,'Player'], fontsize=9, ha='right', color='red')
+# Label the top contributors
+labelled = players_data[players_data['G+A'] >= 13.0]  # Adjust as needed
+for minutes, g_a, player in zip(labelled['Min'], labelled['G+A'], labelled['Player']):
+    plt.text(minutes, g_a, player, fontsize=9, ha='right', color='red')
 
 plt.xlabel("Min")
 plt.ylabel("G+A")
@@ -0,0 +1,84 @@
+'''
+Memory saved by the compact goals-added dtypes (timbers.schema), and a
+check that they leave results unchanged:
+
+- league-wide percentiles for every stored season, with per 90 values
+  recomputed from the float32 sums the way SeasonStore.grouped does
+- game ratings from normalize_data on synthetic per-game rows
+
+Run from the repo root:
+    python benchmarks/bench_compact.py
+'''
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, 'Spider Chart'))
+sys.path.append(os.path.join(ROOT, 'Performance Density Project'))
+from timbers.flatten import flatten_nested
+from timbers.gplus_dataset import GplusDataset, season_key
+from timbers.schema import compact, memory_report
+from percentiles import PARAMS, league_percentiles
+from helper_funcs import normalize_data
+from synthetic import make_goals_added
+
+
+def plain(df):
+    # The dtypes the frames had before timbers.schema
+    dtypes = {}
+    for col, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            dtypes[col] = object
+        elif dtype == np.float32:
+            dtypes[col] = np.float64
+        elif dtype == np.int32:
+            dtypes[col] = np.int64
+    return df.astype(dtypes)
+
+
+def regrouped(df):
+    df = compact(df)
+    per90_minutes = df['minutes_played'].astype('float64') / 90
+    df['goals_added_raw_per90'] = df['goals_added_raw'].astype('float64') / per90_minutes
+    df['goals_added_above_avg_per90'] = df['goals_added_above_avg'].astype('float64') / per90_minutes
+    return df
+
+
+def percentile_table(df):
+    table = league_percentiles(df).reset_index()
+    return table.sort_values(['player_id', 'general_position']).reset_index(drop=True)[PARAMS].to_numpy(np.float64)
+
+
+def check_seasons():
+    dataset = GplusDataset(os.path.join(ROOT, 'Spider Chart', 'Cache Data', 'gplus'))
+    for season in dataset.seasons():
+        before = plain(dataset.read(season_key(season), {}, None, allow_stale=True))
+        after = regrouped(before)
+        saved = memory_report(before, after).loc['total']
+
+        a, b = percentile_table(before), percentile_table(after)
+        same = np.array_equal(a, b, equal_nan=True)
+        print(f"{season}: {len(before):>6} rows  {saved['before'] / 1e6:6.2f} MB -> {saved['after'] / 1e6:5.2f} MB "
+              f"({saved['saved'] / saved['before']:.0%} saved)  percentiles identical: {same}")
+
+
+def check_ratings():
+    rows = flatten_nested(make_goals_added(n_players=600, n_games=34), 'data')
+    before = normalize_data(rows.copy())
+    after = normalize_data(compact(rows))
+    saved = memory_report(rows, compact(rows)).loc['total']
+
+    diff = np.abs(before['rating'].to_numpy() - after['rating'].to_numpy()).max()
+    same_display = (before['rating'].round(1) == after['rating'].round(1)).mean()
+    print(f"game rows: {len(rows)} rows  {saved['before'] / 1e6:6.2f} MB -> {saved['after'] / 1e6:5.2f} MB "
+          f"({saved['saved'] / saved['before']:.0%} saved)  max rating diff {diff:.1e}, "
+          f"{same_display:.2%} identical at display precision")
+
+
+if __name__ == '__main__':
+    check_seasons()
+    check_ratings()
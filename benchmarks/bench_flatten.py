@@ -0,0 +1,65 @@
+'''
+Compare the shared flatten_nested engine against the old
+explode + apply(pd.Series) wrangle, on synthetic league-sized pulls.
+
+Run from the repo root:
+    python benchmarks/bench_flatten.py [scale ...]
+'''
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from timbers.flatten import flatten_nested
+from synthetic import make_goals_added
+
+
+def legacy_wrangle(main_df):
+    expanded_data = main_df.explode('data')
+    expanded_data = pd.concat(
+        [expanded_data.drop(columns=['data']), expanded_data['data'].apply(pd.Series)],
+        axis=1
+    )
+    return expanded_data
+
+
+def check_mixed_types():
+    # ASA sends whole-number g+ as ints, so the first record's type can't
+    # decide a column's dtype
+    main_df = make_goals_added(n_players=50, n_games=2)
+    main_df.loc[0, 'data'][0]['goals_added_raw'] = 0
+    main_df.loc[0, 'data'][1]['goals_added_above_avg'] = 1
+    pd.testing.assert_frame_equal(flatten_nested(main_df), legacy_wrangle(main_df))
+
+    mixed = pd.DataFrame({'player_id': ['a', 'b'],
+                          'data': [[{'goals_added_raw': 0}], [{'goals_added_raw': 0.37}]]})
+    pd.testing.assert_frame_equal(flatten_nested(mixed), legacy_wrangle(mixed))
+    print("mixed int/float columns: output identical")
+
+
+def run(scale):
+    main_df = make_goals_added(n_players=800 * scale, n_games=34)
+
+    start = time.perf_counter()
+    expected = legacy_wrangle(main_df)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = flatten_nested(main_df)
+    new_time = time.perf_counter() - start
+
+    # Row-for-row: same index, same columns, same dtypes, same values
+    pd.testing.assert_frame_equal(result, expected)
+
+    print(f"scale={scale:>3} rows={len(result):>9,} "
+          f"legacy={legacy_time:8.3f}s flatten={new_time:8.3f}s "
+          f"speedup={legacy_time / new_time:6.1f}x  output identical")
+
+
+if __name__ == '__main__':
+    scales = [int(arg) for arg in sys.argv[1:]] or [1, 3]
+    check_mixed_types()
+    for scale in scales:
+        run(scale)
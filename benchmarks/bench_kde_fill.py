@@ -0,0 +1,84 @@
+'''
+Per-figure render time of the KDE gradient fill: one fill_between per
+segment (old) against gradient_fill's single PolyCollection (new), on a
+plot_a_game-style 4x4 grid of 200-point curves. Also reports output size
+and the largest per-pixel difference between the two PNGs.
+
+Run from the repo root:
+    python benchmarks/bench_kde_fill.py [repeats]
+'''
+import io
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.colors import LinearSegmentedColormap, Normalize
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Performance Density Project')))
+from helper_funcs import gradient_fill
+
+CMAP = LinearSegmentedColormap.from_list("custom_cmap", [(1, 0, 0), (1, 1, 0), (0, 1, 0)])
+NORM = Normalize(vmin=-0.3, vmax=0.3)
+
+
+def curves(n_players=16, n_points=200, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.linspace(-0.3, 0.3, n_points)
+    result = []
+    for _ in range(n_players):
+        mu, sd = rng.normal(0, 0.05), rng.uniform(0.03, 0.08)
+        result.append((x, np.exp(-0.5 * ((x - mu) / sd) ** 2) / (sd * np.sqrt(2 * np.pi))))
+    return result
+
+
+def fill_per_segment(ax, x, y):
+    for j in range(len(x) - 1):
+        ax.fill_between(x[j:j+2], 0, y[j:j+2], color=CMAP(NORM(x[j])), alpha=0.8)
+
+
+def fill_single(ax, x, y):
+    gradient_fill(ax, x, y, CMAP, NORM, alpha=0.8)
+
+
+def render(fill, data, fmt):
+    fig, axes = plt.subplots(4, 4, figsize=(24, 18))
+    for ax, (x, y) in zip(axes.flatten(), data):
+        ax.plot(x, y, color='white', linewidth=1.5)
+        fill(ax, x, y)
+        ax.set_xlim(-0.3, 0.3)
+        ax.axis('off')
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, dpi=50)
+    plt.close(fig)
+    return buf.getvalue()
+
+
+def time_render(fill, data, fmt, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        out = render(fill, data, fmt)
+        times.append(time.perf_counter() - start)
+    return min(times), out
+
+
+if __name__ == '__main__':
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    data = curves()
+
+    for fmt in ('png', 'svg'):
+        old_time, old_out = time_render(fill_per_segment, data, fmt, repeats)
+        new_time, new_out = time_render(fill_single, data, fmt, repeats)
+        print(f"{fmt}: per-segment {old_time:6.3f}s {len(old_out) / 1024:8.0f} KiB | "
+              f"single artist {new_time:6.3f}s {len(new_out) / 1024:8.0f} KiB | "
+              f"speedup {old_time / new_time:5.1f}x")
+
+        if fmt == 'png':
+            old_img = plt.imread(io.BytesIO(old_out))
+            new_img = plt.imread(io.BytesIO(new_out))
+            print(f"png: max pixel difference {np.abs(old_img - new_img).max():.4f}, "
+                  f"mean {np.abs(old_img - new_img).mean():.6f}")
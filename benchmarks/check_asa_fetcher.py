@@ -0,0 +1,118 @@
+'''
+Check ASAFetcher against a local stub of the ASA API, with the real
+AmericanSoccerAnalysis client, so nothing touches the network:
+
+    concurrency   three 0.5s requests plus a duplicate finish together,
+                  and the duplicate isn't sent
+    retries       an endpoint failing with 503 twice succeeds on the
+                  third attempt
+    clients       each worker thread has its own client and session, all
+                  sharing one HTTP cache, and concurrent first calls to the
+                  lazily loaded entity tables all get the full table
+
+Run from the repo root:
+    python benchmarks/check_asa_fetcher.py
+'''
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from timbers.asa import ASAFetcher
+
+SLOW_SECONDS = 0.5
+PLAYERS = [{'player_id': f"p{i:03d}", 'player_name': f"Player {i}"} for i in range(50)]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    hits = Counter()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        with self.lock:
+            self.hits[self.path] += 1
+            hits = self.hits[self.path]
+
+        if path.endswith('/players/goals-added'):
+            time.sleep(SLOW_SECONDS)
+            body = [{'player_id': 'p000', 'goals_added_raw': 0.1}]
+        elif path.endswith('/teams/goals-added') and hits <= 2:
+            self.send_response(503)
+            self.end_headers()
+            return
+        elif path.endswith('/teams/goals-added'):
+            body = [{'team_id': 't000', 'goals_added_raw': 1.0}]
+        elif path.endswith('/mls/players'):
+            # Slow enough that concurrent first calls overlap
+            time.sleep(0.1)
+            body = PLAYERS
+        else:
+            body = []
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def check_concurrency(fetcher):
+    # Load the client library first, so only the requests are timed
+    import itscalledsoccer.client  # noqa: F401
+
+    start = time.perf_counter()
+    results = fetcher.fetch_many({
+        season: ('get_player_goals_added', {'leagues': 'mls', 'season_name': season})
+        for season in ['2023', '2024', '2025']
+    } | {'again': ('get_player_goals_added', {'leagues': 'mls', 'season_name': '2025'})})
+    elapsed = time.perf_counter() - start
+    sent = sum(n for path, n in StubHandler.hits.items() if 'players/goals-added' in path)
+    assert len(results) == 4 and sent == 3, (len(results), sent)
+    assert elapsed < 2 * SLOW_SECONDS, elapsed
+    print(f"concurrency: 4 calls (1 duplicate), 3 requests sent, {elapsed:.2f}s")
+
+
+def check_retries(fetcher):
+    teams = fetcher.get_team_goals_added(leagues='mls')
+    sent = sum(n for path, n in StubHandler.hits.items() if 'teams/goals-added' in path)
+    assert len(teams) == 1 and sent == 3, (len(teams), sent)
+    print("retries: 503 twice, then succeeded on attempt 3")
+
+
+def check_clients(fetcher):
+    # Enough concurrent first calls to start every worker's client
+    futures = [fetcher.submit('get_players', leagues='mls', ids=f"p{i:03d}") for i in range(16)]
+    found = [len(future.result()) for future in futures]
+    assert found == [1] * 16, found
+
+    clients = fetcher._clients
+    sessions = {id(client.session) for client in clients}
+    caches = {id(client.session.get_adapter('http://').cache) for client in clients}
+    assert len(clients) > 1 and len(sessions) == len(clients), (len(clients), len(sessions))
+    assert len(caches) == 1, caches
+    print(f"clients: {len(clients)} workers, {len(sessions)} sessions, 1 shared HTTP cache, "
+          f"16 concurrent entity lookups correct")
+
+
+if __name__ == '__main__':
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    fetcher = ASAFetcher(max_workers=8, backoff=0.05,
+                         base_url=f"http://127.0.0.1:{server.server_address[1]}/api/v1/")
+    try:
+        check_concurrency(fetcher)
+        check_retries(fetcher)
+        check_clients(fetcher)
+    finally:
+        fetcher.close()
+        server.shutdown()
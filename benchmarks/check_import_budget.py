@@ -0,0 +1,88 @@
+'''
+Import-time budget for the script modules that scheduled jobs load.
+
+Each module is imported in a fresh interpreter under -X importtime. The
+check fails (non-zero exit) if the module pulls in a plotting or API client
+library at import time, or if its cumulative import time goes more than its
+allowance over a bare "import pandas" measured the same way, so the budget
+holds on slower and faster machines alike.
+
+The same budgets are enforced by tests/test_import_budget.py, so
+"python -m pytest" fails on a regression. Run from the repo root for the
+full table:
+    python benchmarks/check_import_budget.py [repeats]
+'''
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Loaded only when a chart is drawn or ASA is called
+HEAVY_MODULES = ['matplotlib', 'seaborn', 'mplsoccer', 'itscalledsoccer', 'scipy']
+
+# (directory, module) -> milliseconds allowed on top of pandas
+BUDGETS = {
+    ('Spider Chart', 'percentiles'): 150,
+    ('Spider Chart', 'season_data'): 300,
+    ('Spider Chart', 'spiderchart'): 300,
+    ('Spider Chart', 'mostimproved'): 300,
+    ('Spider Chart', 'similarity'): 300,
+    ('Spider Chart', 'batch_radar'): 300,
+    ('Spider Chart', 'rolling_form'): 300,
+    ('Performance Density Project', 'ratings'): 150,
+    ('Performance Density Project', 'density'): 150,
+    ('Performance Density Project', 'helper_funcs'): 400,
+    ('Performance Density Project', 'matchday_report'): 400,
+}
+
+
+def import_time(directory, module, repeats=3):
+    '''
+    Best cumulative import time of module over repeats fresh interpreters.
+
+    Returns:
+        (milliseconds, list of HEAVY_MODULES that got imported)
+    '''
+    code = (f"import sys, {module}; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    best = None
+    loaded = []
+    for _ in range(repeats):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                                cwd=os.path.join(ROOT, directory), capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+        # Lines are "import time: self [us] | cumulative | name"
+        for line in result.stderr.splitlines():
+            parts = line.split('|')
+            if len(parts) == 3 and parts[2].strip() == module:
+                cumulative = int(parts[1]) / 1000
+                best = cumulative if best is None else min(best, cumulative)
+        loaded = [m for m in result.stdout.strip().split(',') if m]
+    return best, loaded
+
+
+if __name__ == '__main__':
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    pandas_ms, _ = import_time('.', 'pandas', repeats)
+    print(f"{'pandas':<44} {pandas_ms:8.1f} ms (baseline)")
+
+    failures = []
+    for (directory, module), allowance in BUDGETS.items():
+        ms, loaded = import_time(directory, module, repeats)
+        over = ms - pandas_ms
+        status = 'ok'
+        if loaded:
+            status = f"FAIL imports {', '.join(loaded)}"
+            failures.append(module)
+        elif over > allowance:
+            status = f"FAIL over budget by {over - allowance:.0f} ms"
+            failures.append(module)
+        print(f"{directory + '/' + module:<44} {ms:8.1f} ms  (+{over:6.1f} / {allowance} ms)  {status}")
+
+    if failures:
+        print(f"\n{len(failures)} module(s) over their import budget: {', '.join(failures)}")
+        sys.exit(1)
@@ -0,0 +1,432 @@
+'''
+Stage-by-stage benchmarks of the g+ pipeline: ingest -> wrangle ->
+aggregate -> percentiles -> most improved -> render.
+
+Datasets:
+    cache   the checked-in season files in Spider Chart/Cache Data/gplus and
+            the dated CSV exports in Data/
+    1, 10, 100
+            synthetic leagues with that many times the players of an MLS
+            season (synthetic.py), served by a stub ASA client, so nothing
+            touches the network. 100 isn't run by default: its ingest alone
+            takes the better part of an hour over the repeats, so ask for
+            it when recording a baseline.
+
+Every cache the stages write (reference tables, the identity index,
+snapshots, season files) goes to a scratch directory per dataset, and the
+module-level stores are reset for each dataset, so a run leaves the working
+tree untouched and one dataset's tables never leak into the next. Fonts
+come from the checked-in Fonts/ directory.
+
+Each stage is timed over --repeat runs (best and median wall time kept) and
+then run once more under tracemalloc for its peak memory (Python and numpy
+allocations; Arrow's own memory pool isn't traced, so the process's peak
+RSS is recorded alongside). Throughput is the
+stage's input rows per second of best wall time. Results are written as
+JSON; with --baseline the run is compared stage by stage against an
+earlier results file and the script exits non-zero on a regression.
+
+Run from the repo root:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --datasets cache 1 10 100 --output benchmarks/results/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/results/baseline.json
+'''
+import argparse
+import contextlib
+import datetime
+import glob
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, 'Spider Chart'))
+sys.path.append(os.path.join(ROOT, 'Performance Density Project'))
+import timbers.identity as identity
+import timbers.snapshots as snapshots
+from timbers.cache import atomic_write_json
+from timbers.gplus_dataset import GplusDataset, season_key
+from timbers.reference import REFERENCE
+from timbers.season_store import GPLUS_SCHEMA_VERSION, SeasonStore
+from timbers.snapshots import SnapshotStore
+import mostimproved
+import season_data
+import spiderchart
+from percentiles import league_percentiles
+from density import DENSITIES
+from helper_funcs import wrangle_data, plot_a_game
+from ratings import rate_games
+from synthetic import ACTION_TYPES, StubASA, make_teams
+
+SEASONS = ('2025', '2026')
+# The current season's partitions aren't checked in, so the cache dataset
+# compares the two latest past seasons
+CACHE_SEASONS = ('2024', '2025')
+PLAYERS_PER_SCALE = 800
+DEFAULT_TOLERANCE = 0.25
+
+
+class Stage:
+    '''
+    One timed step. prepare(ctx) runs untimed before every run (e.g. to
+    hand the stage fresh copies so per-frame caches don't flatter repeats);
+    run(ctx) does the work and returns the number of input rows.
+    '''
+
+    def __init__(self, name, run, prepare=None):
+        self.name = name
+        self.run = run
+        self.prepare = prepare
+
+
+# Step 1: Stages shared by both kinds of dataset
+
+def _fresh_frames(ctx):
+    ctx['frames'] = {season: frame.copy() for season, frame in ctx['grouped'].items()}
+
+
+def stage_percentiles(ctx):
+    rows = 0
+    for frame in ctx['frames'].values():
+        league_percentiles(frame)
+        rows += len(frame)
+    # Single-player lookups the way the radar script makes them
+    frame = ctx['frames'][ctx['seasons'][1]]
+    for position in frame['general_position'].dropna().unique()[:4]:
+        names = frame.loc[frame['general_position'] == position, 'player_name'].dropna().unique()[:25]
+        for name in names:
+            spiderchart.calculate_percentiles(frame, player_name=name, position=position)
+    return rows
+
+
+def stage_most_improved(ctx):
+    mostimproved.rank_improvement(*ctx['seasons'])
+    mostimproved.find_most_improved_players(*ctx['seasons'])
+    return sum(len(frame) for frame in ctx['grouped'].values())
+
+
+def stage_radar(ctx):
+    frame = ctx['frames'][ctx['seasons'][1]]
+    player = frame.dropna(subset=['player_name']).iloc[0]
+    percentile = spiderchart.calculate_percentiles(frame, player.player_name, player.general_position)
+    spiderchart.draw_radar_chart(percentile, player.player_name, player.general_position, 'Benchmark',
+                                 ctx['seasons'][1], outpath=os.path.join(ctx['tmp'], 'radar.png'), dpi=100)
+    return 1
+
+
+def _use_dataset(ctx, grouped):
+    # get_data serves the season frames from a scratch copy of the dataset
+    root = os.path.join(ctx['tmp'], 'gplus')
+    season_data.CACHE_DIR = ctx['tmp']
+    season_data.GPLUS = GplusDataset(root)
+    for season, frame in grouped.items():
+        season_data.GPLUS.write(season_key(season), frame, season_data._gplus_params(season),
+                                GPLUS_SCHEMA_VERSION, season=season)
+
+
+# Step 2: The checked-in data
+
+def stage_read_cache(ctx):
+    dataset = GplusDataset(os.path.join(ROOT, 'Spider Chart', 'Cache Data', 'gplus'))
+    ctx['grouped'] = {}
+    for season in ctx['seasons']:
+        ctx['grouped'][season] = dataset.read(season_key(season), {}, None, allow_stale=True)
+    return sum(len(frame) for frame in ctx['grouped'].values())
+
+
+def stage_read_csv(ctx):
+    rows = 0
+    for path in sorted(glob.glob(os.path.join(ROOT, 'Data', '*.csv'))):
+        rows += len(pd.read_csv(path))
+    return rows
+
+
+def stage_snapshots(ctx):
+    # Typed snapshot tables built from scratch, then served from their cache
+    store = SnapshotStore(root=tempfile.mkdtemp(dir=ctx['tmp'], prefix='snapshots'))
+    rows = sum(len(store.table(dataset)) for dataset in store.datasets())
+    store.clear()
+    for dataset in store.datasets():
+        store.table(dataset)
+    return rows
+
+
+def setup_cache(ctx):
+    stage_read_cache(ctx)
+    _use_dataset(ctx, ctx['grouped'])
+
+    # Reference tables built from the stored team ids; one of them plays 'POR'
+    team_ids = sorted(set().union(*(frame['team_id'].dropna().astype(str) for frame in ctx['grouped'].values())))
+    teams = make_teams(28 * len(team_ids))
+    teams['team_id'] = team_ids
+    players = pd.concat([frame[['player_id', 'player_name']] for frame in ctx['grouped'].values()])
+    stub = StubASA()
+    stub.get_teams = lambda **kwargs: teams.copy()
+    stub.get_players = lambda **kwargs: players.astype(object).drop_duplicates('player_id')
+    return stub
+
+
+CACHE_STAGES = [
+    Stage('ingest_parquet', stage_read_cache),
+    Stage('ingest_csv', stage_read_csv),
+    Stage('ingest_snapshots', stage_snapshots),
+    Stage('percentiles', stage_percentiles, _fresh_frames),
+    Stage('most_improved', stage_most_improved),
+    Stage('render_radar', stage_radar, _fresh_frames),
+]
+
+
+# Step 3: Synthetic leagues
+
+def stage_ingest(ctx):
+    root = tempfile.mkdtemp(dir=ctx['tmp'], prefix='games')
+    ctx['stores'] = {}
+    for season in ctx['seasons']:
+        store = SeasonStore(season, root=root)
+        store.refresh(ctx['stub'])
+        ctx['stores'][season] = store
+    return sum(ctx['pull_rows'].values())
+
+
+def stage_wrangle(ctx):
+    ctx['rows'] = wrangle_data(ctx['pull'])
+    return len(ctx['pull'])
+
+
+def stage_aggregate(ctx):
+    player_names = REFERENCE.player_names()
+    ctx['grouped'] = {season: store.grouped(player_names) for season, store in ctx['stores'].items()}
+    # One summed row per player, game and action type
+    return len(ACTION_TYPES) * sum(ctx['pull_rows'].values())
+
+
+def _team_rows(ctx):
+    DENSITIES.clear()
+    rows = ctx['rows']
+    rows = rows[rows['team_id'] == 't0000']
+    dates = pd.to_datetime(rows['date_time_utc'].astype(str)).dt.date
+    ctx['team_rows'] = rows.assign(date_only=dates.to_numpy(),
+                                   player_name=rows['player_id'].map(REFERENCE.player_names()).to_numpy())
+
+
+def stage_render_game(ctx):
+    rows = ctx['team_rows']
+    # plot_a_game's grid holds 16 players
+    per_game = rows.groupby('date_only', observed=True)['player_id'].nunique()
+    game_date = per_game[per_game <= 16].index[0]
+    plot_a_game(rows, str(game_date), 'OPP', True, output_file=os.path.join(ctx['tmp'], 'game.png'),
+                save_fig=True, ratings=rate_games(rows))
+    return len(rows)
+
+
+def setup_synthetic(ctx, scale):
+    stub = StubASA(n_players=PLAYERS_PER_SCALE * scale, sd=0.15)
+    ctx['pull_rows'] = {season: len(stub.get_player_goals_added(season_name=season)) for season in ctx['seasons']}
+    ctx['pull'] = stub.get_player_goals_added(season_name=ctx['seasons'][1])
+    return stub
+
+
+def after_ingest(ctx):
+    stage_aggregate(ctx)
+    _use_dataset(ctx, ctx['grouped'])
+
+
+SYNTHETIC_STAGES = [
+    Stage('ingest', stage_ingest),
+    Stage('wrangle', stage_wrangle),
+    Stage('aggregate', stage_aggregate),
+    Stage('percentiles', stage_percentiles, _fresh_frames),
+    Stage('most_improved', stage_most_improved),
+    Stage('render_game', stage_render_game, _team_rows),
+    Stage('render_radar', stage_radar, _fresh_frames),
+]
+
+
+# Step 4: Running and recording
+
+def measure(stage, ctx, repeat, trace_memory=True):
+    '''
+    Time one stage.
+
+    Returns:
+        dict of rows, best/median wall seconds, peak MB, rows per second
+        and the process's peak RSS so far, or the error if the stage failed
+    '''
+    times = []
+    # The scripts' progress prints would drown the report
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    try:
+        quiet.__enter__()
+        for _ in range(repeat):
+            if stage.prepare is not None:
+                stage.prepare(ctx)
+            start = time.perf_counter()
+            rows = stage.run(ctx)
+            times.append(time.perf_counter() - start)
+
+        peak = None
+        if trace_memory:
+            if stage.prepare is not None:
+                stage.prepare(ctx)
+            tracemalloc.start()
+            stage.run(ctx)
+            peak = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+            tracemalloc.stop()
+    except Exception as e:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return {'error': f"{type(e).__name__}: {e}"}
+    finally:
+        quiet.__exit__(None, None, None)
+
+    best = min(times)
+    return {
+        'rows': int(rows),
+        'wall_s': best,
+        'wall_s_median': statistics.median(times),
+        'peak_mb': peak,
+        'rows_per_s': rows / best if best > 0 else None,
+        # Linux reports KB
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def _isolate(tmp, stub):
+    # The shared stores read and write their caches under tmp, and start empty
+    REFERENCE.__init__(root=os.path.join(tmp, 'reference'), fetcher=stub)
+    identity.IDENTITY_DIR = os.path.join(tmp, 'identity')
+    identity._IDENTITY = None
+    snapshots.SNAPSHOTS = SnapshotStore(root=os.path.join(tmp, 'snapshots'))
+
+
+def run_dataset(name, stages_wanted, repeat, trace_memory):
+    tmp = tempfile.mkdtemp(prefix='timbers-bench-')
+    ctx = {'tmp': tmp, 'seasons': CACHE_SEASONS if name == 'cache' else SEASONS}
+    try:
+        if name == 'cache':
+            stages = CACHE_STAGES
+            stub = setup_cache(ctx)
+        else:
+            stages = SYNTHETIC_STAGES
+            stub = setup_synthetic(ctx, int(name))
+        ctx['stub'] = stub
+        _isolate(tmp, stub)
+
+        results = {}
+        for stage in stages:
+            if stages_wanted and stage.name not in stages_wanted:
+                # Later stages still need what this one builds
+                if stage.name == 'ingest':
+                    stage_ingest(ctx)
+                    after_ingest(ctx)
+                elif stage.name == 'wrangle':
+                    stage_wrangle(ctx)
+                continue
+            results[stage.name] = measure(stage, ctx, repeat, trace_memory)
+            if stage.name == 'ingest':
+                after_ingest(ctx)
+            report(name, stage.name, results[stage.name])
+        return results
+    finally:
+        DENSITIES.clear()
+        identity._IDENTITY = None
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def report(dataset, stage, result):
+    if 'error' in result:
+        print(f"{dataset:>6} {stage:<17} FAILED {result['error']}")
+        return
+    peak = f"{result['peak_mb']:9.1f} MB" if result['peak_mb'] is not None else ' ' * 12
+    rate = f"{result['rows_per_s']:14,.0f} rows/s" if result['rows_per_s'] else ''
+    print(f"{dataset:>6} {stage:<17} {result['rows']:>10,} rows {result['wall_s']:9.3f}s "
+          f"(median {result['wall_s_median']:.3f}s) {peak} {rate}")
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    '''
+    Print each stage's wall time and peak memory against the baseline.
+
+    Returns:
+        list of (dataset, stage, metric, ratio) for every regression beyond
+        the tolerance
+    '''
+    regressions = []
+    print(f"\nAgainst baseline from {baseline['environment'].get('created')} "
+          f"(commit {baseline['environment'].get('commit')}):")
+    for dataset, stages in results.items():
+        for stage, result in stages.items():
+            before = baseline['results'].get(dataset, {}).get(stage)
+            if before is None or 'error' in before or 'error' in result:
+                continue
+            line = f"{dataset:>6} {stage:<17}"
+            for metric in ('wall_s', 'peak_mb'):
+                if before.get(metric) and result.get(metric) is not None:
+                    ratio = result[metric] / before[metric]
+                    flag = ''
+                    if ratio > 1 + tolerance:
+                        regressions.append((dataset, stage, metric, ratio))
+                        flag = ' REGRESSION'
+                    line += f"  {metric} {before[metric]:9.3f} -> {result[metric]:9.3f} ({ratio:5.2f}x){flag}"
+            print(line)
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the g+ pipeline stage by stage")
+    parser.add_argument("--datasets", nargs="+", default=['cache', '1', '10'],
+                        help="'cache' and/or synthetic scales, e.g. 1 10 100 (100 is slow, see above)")
+    parser.add_argument("--stages", nargs="+", default=None, help="only these stages")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--output", default=os.path.join(ROOT, 'benchmarks', 'results', 'latest.json'))
+    parser.add_argument("--baseline", default=None, help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown / memory growth before a stage counts as a regression")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.datasets:
+        results[name] = run_dataset(name, args.stages, args.repeat, not args.no_memory)
+
+    atomic_write_json({'environment': environment(), 'results': results}, args.output)
+    print(f"\nWrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
@@ -0,0 +1,96 @@
+'''
+Synthetic ASA-shaped data for the benchmark scripts.
+
+Mirrors what AmericanSoccerAnalysis.get_player_goals_added(split_by_games=True)
+returns: one row per player per game with a nested 'data' list holding one
+dict per action type.
+'''
+import numpy as np
+import pandas as pd
+
+ACTION_TYPES = ['Dribbling', 'Fouling', 'Interrupting', 'Passing', 'Receiving', 'Shooting']
+POSITIONS = ['GK', 'CB', 'FB', 'DM', 'CM', 'AM', 'W', 'ST']
+
+
+def make_goals_added(n_players=800, n_games=34, seed=0, sd=0.05):
+    rng = np.random.default_rng(seed)
+    n_teams = max(n_players // 28, 2)
+    player_ids = np.array([f"p{i:06d}" for i in range(n_players)])
+    team_ids = np.array([f"t{i % n_teams:04d}" for i in range(n_players)])
+    positions = rng.choice(POSITIONS, size=n_players)
+    dates = pd.date_range('2025-02-22', periods=n_games, freq='7D')
+
+    rows = []
+    for game in range(n_games):
+        # Roughly 14 of each team's players feature in a game
+        played = rng.random(n_players) < 0.5
+        minutes = rng.integers(1, 91, size=n_players)
+        raw = rng.normal(0.0, sd, size=(n_players, len(ACTION_TYPES)))
+        above = raw - 0.01
+        counts = rng.integers(0, 40, size=(n_players, len(ACTION_TYPES)))
+        for p in np.flatnonzero(played):
+            rows.append({
+                'player_id': player_ids[p],
+                'game_id': f"g{game:05d}{team_ids[p]}",
+                'team_id': team_ids[p],
+                'general_position': positions[p],
+                'minutes_played': int(minutes[p]),
+                'date_time_utc': dates[game].strftime('%Y-%m-%d %H:%M:%S UTC'),
+                'data': [
+                    {
+                        'action_type': action,
+                        'goals_added_raw': float(raw[p, a]),
+                        'goals_added_above_avg': float(above[p, a]),
+                        'count_actions': int(counts[p, a]),
+                    }
+                    for a, action in enumerate(ACTION_TYPES)
+                ],
+            })
+
+    return pd.DataFrame(rows)
+
+
+def make_players(n_players=800):
+    return pd.DataFrame({
+        'player_id': [f"p{i:06d}" for i in range(n_players)],
+        'player_name': [f"Player {i}" for i in range(n_players)],
+    })
+
+
+def make_teams(n_players=800):
+    n_teams = max(n_players // 28, 2)
+    team_ids = [f"t{i:04d}" for i in range(n_teams)]
+    abbreviations = ['POR'] + [f"T{i:02d}" for i in range(1, n_teams)]
+    names = ['Portland Timbers FC'] + [f"Team {i}" for i in range(1, n_teams)]
+    return pd.DataFrame({
+        'team_id': team_ids,
+        'team_name': names,
+        'team_short_name': names,
+        'team_abbreviation': abbreviations,
+    })
+
+
+class StubASA:
+    '''
+    Stands in for AmericanSoccerAnalysis / ASAFetcher without the network:
+    each season's goals-added pull is synthetic (seeded by the season), and
+    the players and teams tables match it. Team t0000 is 'POR'.
+    '''
+
+    def __init__(self, n_players=800, n_games=34, sd=0.05):
+        self.n_players = n_players
+        self.n_games = n_games
+        self.sd = sd
+        self._pulls = {}
+
+    def get_player_goals_added(self, season_name='2026', **kwargs):
+        season = str(season_name)
+        if season not in self._pulls:
+            self._pulls[season] = make_goals_added(self.n_players, self.n_games, seed=int(season), sd=self.sd)
+        return self._pulls[season].copy()
+
+    def get_players(self, **kwargs):
+        return make_players(self.n_players)
+
+    def get_teams(self, **kwargs):
+        return make_teams(self.n_players)
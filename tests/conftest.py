@@ -0,0 +1,6 @@
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+# The timbers package, and the synthetic data and stub client the benchmarks use
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'benchmarks')]
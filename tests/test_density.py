@@ -0,0 +1,40 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'Performance Density Project'))
+from density import GRID_SIZE, DensityCache, batch_kde
+
+
+def _values(seed=0):
+    # One player spread over the league's range, one clustered tightly
+    rng = np.random.default_rng(seed)
+    wide = rng.normal(0.0, 0.2, 30)
+    narrow = rng.normal(0.05, 0.002, 30)
+    return np.r_[wide, narrow], np.r_[['wide'] * 30, ['narrow'] * 30]
+
+
+def test_every_curve_gets_the_full_grid():
+    values, groups = _values()
+    curves = DensityCache().curves(pd.DataFrame({'player_id': groups, 'v': values}), 'v')
+
+    for player in ('wide', 'narrow'):
+        x, y = curves[player]
+        assert len(x) == len(y) == GRID_SIZE
+        # Normalized over its own range
+        assert np.trapezoid(y, x) == pytest.approx(1.0, abs=1e-3)
+
+
+def test_matches_scipy():
+    stats = pytest.importorskip('scipy.stats')
+    values, groups = _values(1)
+    labels, grids, densities = batch_kde(values, groups, bw_adjust=0.42)
+
+    for i, label in enumerate(labels):
+        own = values[groups == label]
+        kde = stats.gaussian_kde(own)
+        kde.set_bandwidth(kde.factor * 0.42)
+        np.testing.assert_allclose(densities[i], kde(grids[i]), rtol=1e-9)
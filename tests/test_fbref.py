@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+
+from timbers.fbref import extract_table, parse_table, squad_standard_stats
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'fbref_squad_standard.html')
+
+
+def _html():
+    with open(FIXTURE, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_standard_stats_columns_and_rows():
+    players, totals = squad_standard_stats(_html())
+
+    assert list(players.columns) == ['Player', 'Nation', 'Pos', 'Age', 'MP', 'Starts', 'Min', '90s', 'Gls', 'Ast',
+                                     'G+A', 'Gls_Per90', 'Ast_Per90', 'G+A_Per90', 'Matches']
+    # The repeated header row inside the body is dropped
+    assert players['Player'].tolist() == ['Evander', 'Felipe Mora', 'Juan Mosquera', 'Trey Hunter']
+    assert players['Nation'].tolist() == ['br BRA', 'cl CHI', 'co COL', 'us USA']
+    assert players['Age'].tolist() == ['26-160', '31-032', '23-011', '23-190']
+
+    # Thousands separators are parsed; a player with no minutes has NaN
+    np.testing.assert_array_equal(players['Min'], [2840, 2315, 2501, np.nan])
+    np.testing.assert_array_equal(players['G+A'], [34, 17, 2, np.nan])
+    np.testing.assert_allclose(players['G+A_Per90'], [1.08, 0.66, 0.07, np.nan])
+
+    assert totals['Player'].tolist() == ['Squad Total', 'Opponent Total']
+    assert totals['Min'].tolist() == [3060, 3060]
+    assert totals['Gls'].tolist() == [65, 56]
+
+
+def test_commented_table_is_found():
+    html = _html()
+    assert extract_table(html, 'stats_keeper*').startswith('<table class="stats_table sortable min_width" '
+                                                           'id="stats_keeper_22"')
+
+    keepers = parse_table(html, 'stats_keeper_22')
+    assert keepers['Player'].tolist() == ['James Pantemis']
+    assert keepers['Min'].tolist() == [1800]
+    assert keepers['Save%'].tolist() == [68.4]
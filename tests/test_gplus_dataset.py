@@ -0,0 +1,64 @@
+import os
+
+import pandas as pd
+import pyarrow.dataset as ds
+
+from timbers.cache import FreshnessPolicy
+from timbers.gplus_dataset import GplusDataset, _matches_layout, season_key
+from timbers.season_store import GPLUS_COLUMNS
+
+CHECKED_IN = os.path.join(os.path.dirname(__file__), '..', 'Spider Chart', 'Cache Data', 'gplus')
+
+
+def _frame(n_players):
+    # Enough players in one season for the id dictionaries to need int16
+    positions = ['CB', 'ST', 'W']
+    return pd.DataFrame({
+        'player_id': [f"p{i:04d}" for i in range(n_players)],
+        'action_type': 'Passing',
+        'goals_added_raw': 0.1,
+        'goals_added_above_avg': 0.0,
+        'count_actions': 10,
+        'minutes_played': 900,
+        'goals_added_raw_per90': 0.01,
+        'goals_added_above_avg_per90': 0.0,
+        'player_name': [f"Player {i}" for i in range(n_players)],
+        'general_position': [positions[i % 3] for i in range(n_players)],
+        'team_id': 't1',
+    }).astype({'player_id': 'category', 'player_name': 'category', 'general_position': 'category'})
+
+
+def test_standard_readers_read_the_root(tmp_path):
+    dataset = GplusDataset(str(tmp_path))
+    dataset.write(season_key('2024'), _frame(20), {}, 1, season='2024')
+    dataset.write(season_key('2025'), _frame(600), {}, 1, season='2025')
+
+    assert len(pd.read_parquet(str(tmp_path))) == 620
+    table = ds.dataset(str(tmp_path), format='parquet', partitioning='hive').to_table()
+    assert table.num_rows == 620
+
+    read = dataset.read(season_key('2025'), {}, 1)
+    assert list(read.columns) == GPLUS_COLUMNS
+    cbs = dataset.query(positions=['CB'], columns=['player_id', 'season'])
+    assert len(cbs) == 7 + 200 and set(cbs['season']) == {'2024', '2025'}
+
+
+def test_adopt_checks_the_layout(tmp_path):
+    dataset = GplusDataset(str(tmp_path), policy=FreshnessPolicy(current_season=2026))
+    dataset._write_frame(season_key('2024'), _frame(20))
+    # A season in the old layout, with the position inside the file too
+    old_dir = tmp_path / season_key('2023') / 'general_position=CB'
+    old_dir.mkdir(parents=True)
+    _frame(20).to_parquet(old_dir / 'part-0.parquet', index=False)
+
+    adopted = dataset.adopt_past_seasons(lambda season: {}, 1, GPLUS_COLUMNS)
+
+    assert adopted == ['2024']
+    assert dataset.entry(season_key('2023')) is None
+
+
+def test_checked_in_seasons_have_the_current_layout():
+    dataset = GplusDataset(CHECKED_IN)
+    for season in dataset.seasons():
+        files = dataset._files(season_key(season))
+        assert files and _matches_layout(files, GPLUS_COLUMNS), season
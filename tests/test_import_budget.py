@@ -0,0 +1,18 @@
+import pytest
+
+from check_import_budget import BUDGETS, import_time
+
+
+@pytest.fixture(scope='module')
+def pandas_ms():
+    ms, _ = import_time('.', 'pandas')
+    return ms
+
+
+@pytest.mark.parametrize('directory, module', list(BUDGETS), ids=[module for _, module in BUDGETS])
+def test_import_budget(directory, module, pandas_ms):
+    ms, loaded = import_time(directory, module)
+
+    assert loaded == [], f"{module} imports {', '.join(loaded)} at import time"
+    allowance = BUDGETS[(directory, module)]
+    assert ms - pandas_ms <= allowance, f"{module} takes {ms - pandas_ms:.0f} ms over pandas, allowed {allowance}"
@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import timbers.season_store as season_store
+from synthetic import StubASA
+from timbers.reference import MissingReferenceError, ReferenceStore
+from timbers.season_store import SeasonStore
+
+
+class GamesStub(StubASA):
+    '''
+    A g+ pull without kickoff times, and a games table that is missing the
+    newest games until it's fetched fresh (or always, with stuck=True).
+    '''
+
+    def __init__(self, missing=2, stuck=False):
+        super().__init__(n_players=120, n_games=8)
+        self.missing = missing
+        self.stuck = stuck
+        self.games_calls = 0
+
+    def get_player_goals_added(self, season_name='2026', **kwargs):
+        return super().get_player_goals_added(season_name).drop(columns='date_time_utc')
+
+    def get_games(self, seasons, **kwargs):
+        self.games_calls += 1
+        pull = super().get_player_goals_added(seasons[0])
+        games = pull[['game_id', 'date_time_utc']].drop_duplicates('game_id').sort_values('date_time_utc')
+        newest = games['date_time_utc'].drop_duplicates().sort_values().tail(self.missing)
+        if self.stale:
+            games = games[~games['date_time_utc'].isin(newest)]
+        return games.assign(home_team_id=None, away_team_id=None, season_name=seasons[0])
+
+    @property
+    def stale(self):
+        return self.stuck or self.games_calls == 1
+
+    def fetch_fresh(self, method, **kwargs):
+        return getattr(self, method)(**kwargs)
+
+
+def _store(tmp_path, monkeypatch, stub):
+    monkeypatch.setattr(season_store, 'REFERENCE', ReferenceStore(root=str(tmp_path / 'reference'), fetcher=stub))
+    return SeasonStore('2026', root=str(tmp_path / 'games'))
+
+
+def test_new_games_refetch_the_games_table(tmp_path, monkeypatch):
+    stub = GamesStub()
+    store = _store(tmp_path, monkeypatch, stub)
+
+    ingested = store.refresh(stub)
+
+    assert stub.games_calls == 2
+    assert ingested == len(store.game_files())
+    games = store.load_games()
+    totals = pd.read_parquet(store.totals_path)
+    assert totals['minutes_played'].sum() == games['minutes_played'].sum()
+    assert sorted(games['game_id'].unique()) == store.state['game_ids']
+
+
+def test_unknown_games_are_not_written(tmp_path, monkeypatch):
+    stub = GamesStub(stuck=True)
+    store = _store(tmp_path, monkeypatch, stub)
+
+    with pytest.raises(MissingReferenceError):
+        store.refresh(stub)
+
+    assert store.game_files() == {}
+    assert not os.path.exists(store.totals_path)
+    assert store.state['game_ids'] == []
+
+
+def test_tables_load_in_parallel(tmp_path):
+    class SlowStub(StubASA):
+        def get_teams(self, **kwargs):
+            time.sleep(0.3)
+            return super().get_teams()
+
+        def get_players(self, **kwargs):
+            time.sleep(0.3)
+            return super().get_players()
+
+    reference = ReferenceStore(root=str(tmp_path), fetcher=SlowStub(n_players=60))
+    threads = [threading.Thread(target=reference.teams), threading.Thread(target=reference.players)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert time.perf_counter() - start < 0.5
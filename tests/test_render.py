@@ -0,0 +1,36 @@
+import json
+
+from timbers.render import render_jobs
+
+MANIFEST = '.test_manifest.json'
+
+
+def _write(job):
+    if job['fail']:
+        raise ValueError('bad job')
+    with open(job['path'], 'w') as f:
+        f.write(job['text'])
+    return job['path']
+
+
+def _jobs(tmp_path, fail=()):
+    return [{'path': str(tmp_path / f"{name}.txt"), 'text': name, 'fail': name in fail} for name in 'abc']
+
+
+def test_unchanged_jobs_are_skipped(tmp_path):
+    written, skipped = render_jobs(_jobs(tmp_path), _write, MANIFEST, 'path', lambda job: job['text'], workers=2)
+    assert sorted(written) == [str(tmp_path / f"{name}.txt") for name in 'abc'] and skipped == 0
+
+    (tmp_path / 'b.txt').unlink()
+    written, skipped = render_jobs(_jobs(tmp_path), _write, MANIFEST, 'path', lambda job: job['text'], workers=2)
+    assert written == [str(tmp_path / 'b.txt')] and skipped == 2
+
+
+def test_failed_jobs_are_retried(tmp_path):
+    written, _ = render_jobs(_jobs(tmp_path, fail='c'), _write, MANIFEST, 'path', lambda job: job['text'], workers=2)
+    assert len(written) == 2
+    with open(tmp_path / MANIFEST) as f:
+        assert sorted(json.load(f)) == [str(tmp_path / 'a.txt'), str(tmp_path / 'b.txt')]
+
+    written, skipped = render_jobs(_jobs(tmp_path), _write, MANIFEST, 'path', lambda job: job['text'], workers=2)
+    assert written == [str(tmp_path / 'c.txt')] and skipped == 2
@@ -0,0 +1,6 @@
+'''
+Shared data helpers for the Timbers analysis scripts.
+
+The scripts in "Performance Density Project" and "Spider Chart" add the repo
+root to sys.path so they can import from here.
+'''
@@ -0,0 +1,200 @@
+'''
+Shared, concurrent access to the American Soccer Analysis API.
+
+All scripts go through one ASAFetcher, which drives a thread pool. The
+AmericanSoccerAnalysis client isn't thread-safe (its requests session and
+the entity tables it loads on first use are shared mutable state), so each
+worker thread gets its own client, and every client's session shares one
+HTTP cache. Independent requests run concurrently, identical requests
+already in flight are shared rather than sent twice, and transient failures
+(connection errors, timeouts, 429/5xx) are retried with exponential backoff.
+
+For tests, point a fetcher at a local stub server with
+ASAFetcher(base_url="http://127.0.0.1:<port>/api/v1/").
+'''
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+# Tables the client loads once and then keeps
+ENTITY_ATTRIBUTES = ['players', 'teams', 'stadia', 'managers', 'referees']
+
+_FETCHER = None
+_FETCHER_LOCK = threading.Lock()
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def is_transient(error):
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code in TRANSIENT_STATUS
+    return False
+
+
+def _default_client():
+    # Imported here so cache-only runs never load the client
+    from itscalledsoccer.client import AmericanSoccerAnalysis
+    return AmericanSoccerAnalysis()
+
+
+class ASAFetcher:
+    '''
+    Thread pool of AmericanSoccerAnalysis clients, one per worker thread.
+
+    Any client method can be called directly (fetcher.get_players(...)),
+    which blocks and returns a copy of the result, or scheduled with
+    submit() / fetch_many() to overlap several requests.
+
+    Args:
+        max_workers: number of worker threads (and so clients)
+        retries: attempts after the first for transient failures
+        backoff: seconds before the first retry, doubled on each one
+        base_url: optional API root, e.g. a local stub server
+        client_factory: optional function returning a new client,
+            defaults to AmericanSoccerAnalysis()
+    '''
+
+    def __init__(self, max_workers=8, retries=3, backoff=0.5, base_url=None, client_factory=None):
+        self.client_factory = client_factory or _default_client
+        if base_url is not None:
+            base_url = base_url if base_url.endswith('/') else base_url + '/'
+        self.base_url = base_url
+
+        self.retries = retries
+        self.backoff = backoff
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='asa')
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._clients = []
+        self._http_cache = None
+        self._heuristic = None
+
+    @property
+    def client(self):
+        '''
+        The calling thread's client, created on its first request.
+        '''
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self.client_factory()
+            if self.base_url is not None:
+                # Entity lookups use BASE_URL, stats and games use base_url
+                client.BASE_URL = self.base_url
+                client.base_url = self.base_url
+            with self._lock:
+                self._share_cache(client)
+                self._clients.append(client)
+            self._local.client = client
+        return client
+
+    def _share_cache(self, client):
+        # Point the new client's session at the first client's HTTP cache
+        # and expiry heuristic, so a response cached by one worker serves
+        # all of them (CacheControl's caches lock their own reads and writes)
+        from cachecontrol.adapter import CacheControlAdapter
+
+        current = client.session.get_adapter('https://')
+        if self._http_cache is None:
+            self._http_cache = getattr(current, 'cache', None)
+            self._heuristic = getattr(current, 'heuristic', None)
+        adapter = CacheControlAdapter(cache=self._http_cache, heuristic=self._heuristic)
+        client.session.mount('https://', adapter)
+        client.session.mount('http://', adapter)
+
+    def _call(self, method, args, kwargs, fresh=False):
+        for attempt in range(self.retries + 1):
+            try:
+                if fresh:
+                    return self._call_fresh(method, args, kwargs)
+                return getattr(self.client, method)(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.retries or not is_transient(e):
+                    raise
+                time.sleep(self.backoff * 2 ** attempt * (1 + random.random()))
+
+    def _call_fresh(self, method, args, kwargs):
+        # The session is this worker's own, so the header and the dropped
+        # entity tables only affect this call
+        client = self.client
+        for attr in ENTITY_ATTRIBUTES:
+            if hasattr(client, attr):
+                setattr(client, attr, None)
+        client.session.headers['Cache-Control'] = 'no-cache'
+        try:
+            return getattr(client, method)(*args, **kwargs)
+        finally:
+            client.session.headers.pop('Cache-Control', None)
+
+    def submit(self, method, *args, _fresh=False, **kwargs):
+        '''
+        Schedule a client call and return its Future. An identical call that
+        is still in flight is shared instead of sent again.
+        '''
+        key = (method, _fresh, _freeze(args), _freeze(kwargs))
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._executor.submit(self._call, method, args, kwargs, _fresh)
+                self._inflight[key] = future
+                future.add_done_callback(lambda _: self._forget(key))
+        return future
+
+    def _forget(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def fetch(self, method, *args, **kwargs):
+        # Shared results are copied so one caller's edits don't leak into another's
+        return self.submit(method, *args, **kwargs).result().copy()
+
+    def fetch_fresh(self, method, *args, **kwargs):
+        '''
+        fetch() that bypasses the HTTP cache and the client's memoized
+        entity tables, e.g. to pick up a game played since they were cached.
+        '''
+        return self.submit(method, *args, _fresh=True, **kwargs).result().copy()
+
+    def fetch_many(self, calls):
+        '''
+        Run several independent calls concurrently.
+
+        Args:
+            calls: dict of name -> (method, kwargs)
+
+        Returns:
+            dict of name -> result, once every call has finished
+        '''
+        futures = {name: self.submit(method, **kwargs) for name, (method, kwargs) in calls.items()}
+        return {name: future.result().copy() for name, future in futures.items()}
+
+    def __getattr__(self, name):
+        if name.startswith('get_'):
+            return lambda *args, **kwargs: self.fetch(name, *args, **kwargs)
+        raise AttributeError(name)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+def get_fetcher():
+    '''
+    The process-wide ASAFetcher, created on first use.
+    '''
+    global _FETCHER
+    with _FETCHER_LOCK:
+        if _FETCHER is None:
+            _FETCHER = ASAFetcher()
+        return _FETCHER
@@ -0,0 +1,222 @@
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to unlocked manifest updates
+    fcntl = None
+
+
+def atomic_write(path, write_fn, suffix=''):
+    '''
+    Write a file via a temp file in the same directory and os.replace, so a
+    reader sees either the old file or the complete new one, never a
+    half-written one.
+
+    Args:
+        path: String, final file path
+        write_fn: function taking the temp path and writing the file there
+        suffix: String, suffix for the temp file (some writers check it)
+    '''
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', suffix=suffix, dir=directory)
+    os.close(fd)
+    try:
+        write_fn(tmp_path)
+        with open(tmp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_parquet(df, path, **kwargs):
+    atomic_write(path, lambda tmp: df.to_parquet(tmp, **kwargs), suffix='.parquet')
+
+
+def atomic_write_json(obj, path):
+    def write(tmp):
+        with open(tmp, 'w') as f:
+            json.dump(obj, f, indent=1, sort_keys=True)
+    atomic_write(path, write, suffix='.json')
+
+
+class FreshnessPolicy:
+    '''
+    How long a cached season stays valid.
+
+    Seasons before the current one are immutable once they were fetched
+    after the season ended. The current season (and past seasons last
+    fetched while they were still running) expire after current_ttl seconds.
+    '''
+
+    def __init__(self, current_ttl=12 * 3600, current_season=None):
+        self.current_ttl = current_ttl
+        self.current_season = current_season
+
+    def season_now(self):
+        return int(self.current_season or datetime.now().year)
+
+    def is_fresh(self, entry, now=None):
+        now = now or time.time()
+        season = entry.get('season')
+        if season is not None:
+            fetched_year = datetime.fromtimestamp(entry['fetched_at']).year
+            if int(season) < self.season_now() and fetched_year > int(season):
+                return True
+        if self.current_ttl is None:
+            return True
+        return now - entry['fetched_at'] < self.current_ttl
+
+
+class CacheManager:
+    '''
+    Manifest-tracked parquet cache.
+
+    Every file written through the manager gets a manifest entry with the
+    query parameters that produced it, fetch time, code/schema version, row
+    count and size. Reads check all of those before trusting a file, and the
+    total size is kept under max_bytes by evicting least recently used
+    entries. Manifest updates take a file lock, so concurrent scripts sharing
+    the directory don't clobber each other's entries.
+    '''
+
+    def __init__(self, root, max_bytes=512 * 1024 ** 2, policy=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.policy = policy or FreshnessPolicy()
+        self.manifest_path = os.path.join(root, 'manifest.json')
+        self.lock_path = os.path.join(root, '.manifest.lock')
+
+    def path_for(self, key):
+        return os.path.join(self.root, f"{key}.parquet")
+
+    # Storage hooks; subclasses that keep an entry as something other than
+    # one parquet file override these
+    def _size(self, key):
+        path = self.path_for(key)
+        return os.path.getsize(path) if os.path.exists(path) else None
+
+    def _write_frame(self, key, df):
+        atomic_write_parquet(df, self.path_for(key))
+
+    def _read_frame(self, key, columns=None, filters=None):
+        return pd.read_parquet(self.path_for(key), columns=columns, filters=filters)
+
+    def _remove(self, key):
+        if os.path.exists(self.path_for(key)):
+            os.remove(self.path_for(key))
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def entry(self, key):
+        return self._load_manifest().get(key)
+
+    def _is_valid(self, entry, key, params, version):
+        if entry is None:
+            return False
+        if entry.get('params') != params or entry.get('version') != version:
+            return False
+        size = self._size(key)
+        return size is not None and size == entry.get('bytes')
+
+    def is_current(self, key, params, version):
+        '''
+        Whether read() would return the entry without allow_stale.
+        '''
+        entry = self.entry(key)
+        return self._is_valid(entry, key, params, version) and self.policy.is_fresh(entry)
+
+    def read(self, key, params, version, columns=None, allow_stale=False, filters=None):
+        '''
+        Read a cached frame if it was produced by the same query and version
+        and is still fresh.
+
+        Args:
+            key: String, cache key (file stem)
+            params: dict, the query parameters the data came from
+            version: int, code/schema version of the aggregation
+            columns: optional list of columns to read
+            allow_stale: Boolean, return expired, mismatched or unmanaged
+                files as a last resort (e.g. when ASA can't be reached)
+            filters: optional pyarrow-style row filters, e.g.
+                [('general_position', '==', 'CB')]
+
+        Returns:
+            dataframe, or None on a miss
+        '''
+        with self._locked():
+            manifest = self._load_manifest()
+            entry = manifest.get(key)
+            usable = self._is_valid(entry, key, params, version) and self.policy.is_fresh(entry)
+            if not usable and not (allow_stale and self._size(key) is not None):
+                return None
+            if entry is not None:
+                entry['last_access'] = time.time()
+                atomic_write_json(manifest, self.manifest_path)
+
+        return self._read_frame(key, columns, filters)
+
+    def write(self, key, df, params, version, season=None):
+        '''
+        Atomically write a frame to the cache, record it in the manifest and
+        evict least recently used entries if over the size budget.
+        '''
+        self._write_frame(key, df)
+
+        with self._locked():
+            manifest = self._load_manifest()
+            now = time.time()
+            manifest[key] = {
+                'params': params,
+                'version': version,
+                'season': None if season is None else str(season),
+                'fetched_at': now,
+                'last_access': now,
+                'rows': int(len(df)),
+                'bytes': self._size(key),
+            }
+            self._evict(manifest, keep=key)
+            atomic_write_json(manifest, self.manifest_path)
+
+    def invalidate(self, key):
+        with self._locked():
+            manifest = self._load_manifest()
+            manifest.pop(key, None)
+            atomic_write_json(manifest, self.manifest_path)
+            self._remove(key)
+
+    def _evict(self, manifest, keep):
+        total = sum(entry['bytes'] for entry in manifest.values())
+        for key in sorted(manifest, key=lambda k: manifest[k]['last_access']):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= manifest.pop(key)['bytes']
+            self._remove(key)
@@ -0,0 +1,182 @@
+'''
+fbref squad pages: cached downloads and single-table parsing.
+
+Pages are cached on disk next to their ETag/Last-Modified headers. Within
+max_age a cached page is used as is; after that it is revalidated with a
+conditional request, so an unchanged page costs a 304 rather than a full
+download, and an unreachable site falls back to the cached copy.
+
+fbref ships most of its tables inside HTML comments. Instead of stripping
+every comment marker and parsing every table on the page, only the
+target table's markup is cut out (by id) and handed to pandas.read_html.
+Parsing works on plain HTML strings, so saved pages can be used offline.
+'''
+import hashlib
+import json
+import os
+import re
+import time
+from io import StringIO
+
+import pandas as pd
+import requests
+
+from timbers.cache import atomic_write, atomic_write_json
+
+FBREF_CACHE_DIR = os.environ.get(
+    'TIMBERS_FBREF_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'timbers', 'fbref')
+)
+DEFAULT_MAX_AGE = 6 * 3600
+
+SQUAD_URL = "https://fbref.com/en/squads/{squad_id}/{slug}-Stats"
+TIMBERS_SQUAD_ID = 'd076914e'
+
+# Text columns of the standard stats table; everything else is numeric
+TEXT_COLUMNS = {'Player', 'Nation', 'Pos', 'Age', 'Matches'}
+TOTAL_ROWS = {'Squad Total', 'Opponent Total', 'Player'}
+
+
+def fetch_html(url, max_age=DEFAULT_MAX_AGE, cache_dir=FBREF_CACHE_DIR, session=None):
+    '''
+    Page HTML, from the disk cache when fresh, otherwise revalidated or
+    downloaded.
+
+    Args:
+        url: String, page URL
+        max_age: seconds a cached page is used without asking the server
+        cache_dir: String, cache directory
+        session: optional requests.Session
+
+    Returns:
+        String, the page HTML
+    '''
+    key = hashlib.sha1(url.encode()).hexdigest()
+    html_path = os.path.join(cache_dir, f"{key}.html")
+    meta_path = os.path.join(cache_dir, f"{key}.json")
+
+    meta = {}
+    if os.path.exists(html_path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if time.time() - meta.get('fetched_at', 0) < max_age:
+            return _read(html_path)
+
+    headers = {}
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+
+    try:
+        response = (session or requests).get(url, headers=headers, timeout=30)
+        if response.status_code != 304:
+            response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        if meta:
+            print(f"Could not refresh {url} ({e}), using cached copy")
+            return _read(html_path)
+        raise
+
+    if response.status_code == 304:
+        meta['fetched_at'] = time.time()
+        atomic_write_json(meta, meta_path)
+        return _read(html_path)
+
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(response.text)
+
+    atomic_write(html_path, write, suffix='.html')
+    atomic_write_json({
+        'url': url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'fetched_at': time.time(),
+    }, meta_path)
+    return response.text
+
+
+def _read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def extract_table(html, table_id):
+    '''
+    The markup of one <table> by id (or id prefix ending in '*'), whether
+    it's in the page body or inside an HTML comment.
+    '''
+    id_pattern = re.escape(table_id[:-1]) + r'[^"]*' if table_id.endswith('*') else re.escape(table_id)
+    match = re.search(r'<table\b[^>]*\bid="' + id_pattern + r'"', html)
+    if match is None:
+        raise ValueError(f"No table with id {table_id}")
+    end = html.find('</table>', match.end())
+    if end == -1:
+        raise ValueError(f"Table {table_id} is not closed")
+    return html[match.start():end + len('</table>')]
+
+
+def dedupe_columns(columns):
+    '''
+    Flatten fbref's two-level headers to unique names. A name that repeats
+    gets its header group appended on the later occurrences, e.g. the
+    second 'G+A' (under 'Per 90 Minutes') becomes 'G+A_Per90'; any
+    remaining clash gets a counter.
+    '''
+    if isinstance(columns, pd.MultiIndex):
+        pairs = [(str(top), str(name)) for top, name in columns]
+    else:
+        pairs = [('', str(name)) for name in columns]
+
+    seen = {}
+    names = []
+    for group, name in pairs:
+        if name in seen:
+            suffix = re.sub(r'\s+Minutes$', '', group).replace(' ', '')
+            candidate = f"{name}_{suffix}" if suffix and not suffix.startswith('Unnamed') else name
+            count = 2
+            while candidate in seen:
+                candidate = f"{name}_{count}"
+                count += 1
+            name = candidate
+        seen[name] = True
+        names.append(name)
+    return names
+
+
+def parse_table(html, table_id):
+    '''
+    One table as a dataframe with unique column names and numeric columns
+    converted (thousands separators included).
+    '''
+    table = pd.read_html(StringIO(extract_table(html, table_id)))[0]
+    table.columns = dedupe_columns(table.columns)
+
+    for col in table.columns:
+        if col in TEXT_COLUMNS:
+            continue
+        values = table[col]
+        if values.dtype == object or pd.api.types.is_string_dtype(values):
+            values = pd.to_numeric(values.astype(str).str.replace(',', '', regex=False), errors='coerce')
+        table[col] = values
+    return table
+
+
+def squad_standard_stats(html):
+    '''
+    The squad's standard stats table split into player rows and the
+    squad/opponent total rows.
+
+    Returns:
+        (players, totals) dataframes
+    '''
+    table = parse_table(html, 'stats_standard*')
+    is_total = table['Player'].isin(TOTAL_ROWS) | table['Player'].isna()
+    players = table[~is_total].reset_index(drop=True)
+    totals = table[table['Player'].isin(TOTAL_ROWS - {'Player'})].reset_index(drop=True)
+    return players, totals
+
+
+def squad_url(squad_id=TIMBERS_SQUAD_ID, slug='Portland-Timbers'):
+    return SQUAD_URL.format(squad_id=squad_id, slug=slug)
@@ -0,0 +1,103 @@
+from itertools import chain
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+
+def _record_count(value):
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return len(value)
+    return 0
+
+
+_INT_TYPES = {int, np.int64, np.int32}
+_FLOAT_TYPES = {float, np.float64, np.float32}
+
+
+def _column_dtype(values):
+    # Decided over every value, not the first: ASA sends whole-number g+
+    # (e.g. 0) as ints in columns that are otherwise floats
+    types = set(map(type, values))
+    if types <= _INT_TYPES:
+        return np.int64
+    if types <= _INT_TYPES | _FLOAT_TYPES:
+        return np.float64
+    return object
+
+
+def _flat_columns(records):
+    '''
+    Turn a flat list of dicts into one typed array per key.
+
+    Every key is read with a C-level map over the records, so no per-row
+    Series or tuple is ever built. Falls back to pandas' record parser when
+    the dicts don't all share the same keys.
+    '''
+    keys = list(records[0])
+    n = len(records)
+    if any(len(record) != len(keys) for record in records):
+        return None
+
+    columns = {}
+    try:
+        for key in keys:
+            values = list(map(itemgetter(key), records))
+            dtype = _column_dtype(values)
+            if dtype is object:
+                columns[key] = pd.Series(values)
+            else:
+                columns[key] = np.fromiter(values, dtype=dtype, count=n)
+    except (KeyError, TypeError, ValueError):
+        # Mixed keys or mixed types (e.g. a None in a float field)
+        return None
+
+    return columns
+
+
+def flatten_nested(main_df, column='data'):
+    '''
+    Flatten a column of list-of-dict records (ASA's g+ 'data' column) into
+    regular columns, one output row per record.
+
+    Matches main_df.explode(column) followed by
+    pd.concat([..., exploded[column].apply(pd.Series)], axis=1) row for row:
+    parent columns are repeated, the original index is kept (with
+    duplicates), and the record fields are appended on the right.
+
+    Args:
+        main_df: dataframe with one nested list of dicts per row
+        column: String, name of the nested column
+
+    Returns:
+        Flattened dataframe
+    '''
+    nested = main_df[column].tolist()
+    lengths = np.fromiter(map(_record_count, nested), dtype=np.int64, count=len(nested))
+
+    # explode keeps empty/missing rows as a single all-NaN row
+    repeats = np.maximum(lengths, 1)
+    positions = np.repeat(np.arange(len(nested)), repeats)
+    base = main_df.drop(columns=[column]).iloc[positions]
+
+    records = list(chain.from_iterable(value for value, count in zip(nested, lengths) if count))
+    if not records:
+        return base
+
+    columns = _flat_columns(records)
+    if columns is None:
+        columns = dict(pd.DataFrame.from_records(records).items())
+
+    if (lengths == 0).any():
+        # Scatter the record values around the placeholder rows
+        filled = np.repeat(lengths > 0, repeats)
+        for key, values in columns.items():
+            values = pd.Series(values)
+            numeric = values.dtype.kind in 'iufb'
+            out = np.full(len(filled), np.nan, dtype=np.float64 if numeric else object)
+            out[filled] = values.to_numpy()
+            columns[key] = out if numeric else pd.Series(out.tolist())
+
+    flat = pd.DataFrame(columns)
+    flat.index = base.index
+    return pd.concat([base, flat], axis=1)
@@ -0,0 +1,34 @@
+'''
+Font registry for the chart scripts.
+
+Every font the charts use is checked into the repo's Fonts/ directory
+(each family with its license), so charts render offline and nothing is
+downloaded. Each font is parsed once per process and the same
+FontProperties object is handed to every chart.
+'''
+import os
+from functools import lru_cache
+
+FONTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Fonts'))
+
+
+@lru_cache(maxsize=None)
+def font_path(name):
+    '''
+    Path to a font's .ttf file in Fonts/, by file stem.
+    '''
+    filename = f"{name}.ttf"
+    for root, _, files in os.walk(FONTS_DIR):
+        if filename in files:
+            return os.path.join(root, filename)
+    raise FileNotFoundError(f"Font {name} is not in {FONTS_DIR}")
+
+
+@lru_cache(maxsize=None)
+def get_font(name):
+    '''
+    FontProperties for a font by file stem, e.g. 'Arvo-Bold' or
+    'Roboto-Thin'. The same object is returned on every call.
+    '''
+    from matplotlib.font_manager import FontProperties
+    return FontProperties(fname=font_path(name))
@@ -0,0 +1,276 @@
+'''
+Multi-season g+ dataset, partitioned by season and general_position.
+
+Season frames from get_data are stored as a hive-style directory tree:
+
+    root/season=2025/general_position=CB/part-0.parquet
+
+Files are written with pyarrow.dataset.write_dataset, so season and
+general_position live only in the directory names and every categorical
+column has the same dictionary type in every file. The root can be read
+with any hive-aware reader, e.g. pd.read_parquet(root) or
+ds.dataset(root, partitioning='hive'); the manifest is "_manifest.json",
+which those readers skip.
+
+Reads go through pyarrow.dataset, so only the requested columns are read
+and filters on season or general_position skip whole directories. Other
+filters (e.g. on minutes_played) are pushed down to the parquet row groups.
+A CB-only percentile calculation reads the CB files only, and a career
+query across every stored season never builds a whole-league frame.
+
+GplusDataset is a CacheManager whose entries are season directories, so
+each season keeps the usual manifest (query parameters, version,
+freshness, size) and LRU eviction. Past seasons shipped in the repo without
+a manifest are adopted as immutable entries instead of being refetched,
+once their files are checked against the current layout and columns.
+'''
+import glob
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from timbers.cache import CacheManager, atomic_write_json
+
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+LEGACY_PATTERN = re.compile(r'^mls_gplus_(\d{4})\.parquet$')
+PARTITION_KEYS = ['season', 'general_position']
+PARTITIONING = ds.partitioning(pa.schema([(name, pa.string()) for name in PARTITION_KEYS]), flavor='hive')
+# One index width for every categorical, whatever its size in a given file
+DICTIONARY_TYPE = pa.dictionary(pa.int32(), pa.string())
+# The frame's column order, kept in the file metadata since the partition
+# keys are read back from the paths
+COLUMNS_KEY = b'timbers.columns'
+
+
+def season_key(season):
+    return f"season={season}"
+
+
+def _prune_positions(files, filters):
+    # Skip whole position directories for general_position == / in filters
+    for column, op, value in filters or []:
+        if column != 'general_position' or op not in ('==', '=', 'in'):
+            continue
+        wanted = {f"general_position={v}" for v in (value if op == 'in' else [value])}
+        files = [f for f in files if os.path.basename(os.path.dirname(f)) in wanted]
+    return files
+
+
+def _payload_table(df, season):
+    # The frame plus its season, with the categoricals on the fixed
+    # dictionary type and the column order in the schema metadata
+    table = pa.Table.from_pandas(df.assign(season=season), preserve_index=False)
+    fields = []
+    for field in table.schema:
+        if field.name in PARTITION_KEYS:
+            field = field.with_type(pa.string())
+        elif pa.types.is_dictionary(field.type):
+            field = field.with_type(DICTIONARY_TYPE)
+        fields.append(field)
+    schema = pa.schema(fields, metadata={COLUMNS_KEY: json.dumps(list(df.columns)).encode()})
+    return table.cast(schema)
+
+
+def _matches_layout(files, columns):
+    # Every file holds exactly the non-key columns, categoricals on the
+    # fixed dictionary type
+    payload = [c for c in columns if c not in PARTITION_KEYS]
+    for path in files:
+        schema = pq.read_schema(path)
+        if schema.names != payload:
+            return False
+        if any(pa.types.is_dictionary(f.type) and f.type != DICTIONARY_TYPE for f in schema):
+            return False
+    return True
+
+
+class GplusDataset(CacheManager):
+    '''
+    Partitioned store of season g+ frames.
+
+    Cache keys are season_key(season); read()/write() behave as in
+    CacheManager but accept pyarrow-style filters, and query() reads across
+    any number of stored seasons.
+    '''
+
+    def __init__(self, root, **kwargs):
+        super().__init__(root, **kwargs)
+        # Underscored, so dataset readers pointed at root skip it
+        self.manifest_path = os.path.join(root, '_manifest.json')
+        old_manifest = os.path.join(root, 'manifest.json')
+        if os.path.exists(old_manifest) and not os.path.exists(self.manifest_path):
+            os.replace(old_manifest, self.manifest_path)
+
+    def path_for(self, key):
+        return os.path.join(self.root, key)
+
+    def _files(self, key):
+        return sorted(glob.glob(os.path.join(self.path_for(key), 'general_position=*', '*.parquet')))
+
+    def _size(self, key):
+        files = self._files(key)
+        return sum(os.path.getsize(f) for f in files) if files else None
+
+    def _write_frame(self, key, df):
+        # Build the season's partitions in a temp directory and swap it in,
+        # so readers never see a half-written season
+        os.makedirs(self.root, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=self.root)
+        try:
+            ds.write_dataset(_payload_table(df, key.split('=', 1)[1]), tmp_dir, format='parquet',
+                             partitioning=PARTITIONING, basename_template='part-{i}.parquet')
+            new_dir = os.path.join(tmp_dir, key)
+            if not os.path.exists(new_dir):
+                os.makedirs(new_dir)
+            os.chmod(new_dir, 0o755)
+
+            path = self.path_for(key)
+            old_dir = None
+            if os.path.exists(path):
+                old_dir = tempfile.mkdtemp(prefix='.old-', dir=self.root)
+                os.replace(path, os.path.join(old_dir, key))
+            os.replace(new_dir, path)
+            if old_dir is not None:
+                shutil.rmtree(old_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _read_frame(self, key, columns=None, filters=None):
+        frame = self._scan(_prune_positions(self._files(key), filters), columns, filters)
+        return frame.drop(columns='season', errors='ignore')
+
+    def _remove(self, key):
+        shutil.rmtree(self.path_for(key), ignore_errors=True)
+
+    def _scan(self, files, columns=None, filters=None):
+        if not files:
+            return pd.DataFrame(columns=columns)
+        # season and general_position come from the paths
+        dataset = ds.dataset(files, format='parquet', partitioning=PARTITIONING, partition_base_dir=self.root)
+        expression = pq.filters_to_expression(filters) if filters else None
+        frame = dataset.to_table(columns=columns, filter=expression).to_pandas()
+        if 'general_position' in frame.columns:
+            frame['general_position'] = frame['general_position'].astype('category')
+        if columns is None and dataset.schema.metadata and COLUMNS_KEY in dataset.schema.metadata:
+            order = json.loads(dataset.schema.metadata[COLUMNS_KEY])
+            frame = frame[order + [c for c in frame.columns if c not in order]]
+        return frame
+
+    def seasons(self):
+        '''
+        Seasons with data on disk, oldest first.
+        '''
+        return sorted(name.split('=', 1)[1] for name in os.listdir(self.root)
+                      if name.startswith('season=')) if os.path.exists(self.root) else []
+
+    def query(self, seasons=None, positions=None, columns=None, filters=None):
+        '''
+        Read stored rows across seasons, regardless of freshness.
+
+        Args:
+            seasons: optional list of seasons, defaults to every stored one
+            positions: optional list of general positions
+            columns: optional list of columns to read; 'season' is available
+                as a column
+            filters: optional pyarrow-style row filters, e.g.
+                [('minutes_played', '>', 800)]
+
+        Returns:
+            dataframe of the matching rows, with a season column
+        '''
+        seasons = self.seasons() if seasons is None else [str(s) for s in seasons]
+        files = []
+        for season in seasons:
+            files.extend(self._files(season_key(season)))
+        if positions is not None:
+            files = _prune_positions(files, [('general_position', 'in', positions)])
+        return self._scan(_prune_positions(files, filters), columns, filters)
+
+    def migrate_legacy(self, legacy_root):
+        '''
+        Move whole-season "mls_gplus_{season}.parquet" files from the old
+        per-file cache in legacy_root into the dataset, keeping their
+        manifest entries (and so their freshness) where there are any.
+
+        Returns:
+            list of migrated seasons
+        '''
+        legacy = CacheManager(legacy_root)
+        migrated = []
+        names = os.listdir(legacy_root) if os.path.exists(legacy_root) else []
+        for name in sorted(names):
+            match = LEGACY_PATTERN.match(name)
+            if match is None:
+                continue
+            season = match.group(1)
+            old_key = name[:-len('.parquet')]
+            key = season_key(season)
+
+            if self._size(key) is None:
+                df = pd.read_parquet(os.path.join(legacy_root, name))
+                self._write_frame(key, df)
+                entry = legacy.entry(old_key)
+                if entry is not None:
+                    with self._locked():
+                        manifest = self._load_manifest()
+                        manifest[key] = dict(entry, bytes=self._size(key))
+                        self._evict(manifest, keep=key)
+                        atomic_write_json(manifest, self.manifest_path)
+                migrated.append(season)
+
+            if legacy.entry(old_key) is not None:
+                legacy.invalidate(old_key)
+            else:
+                os.remove(os.path.join(legacy_root, name))
+        return migrated
+
+    def adopt_past_seasons(self, params_for, version, columns):
+        '''
+        Give manifest entries to stored seasons that have none (e.g. the
+        partitions checked into the repo), for seasons already over. They
+        are recorded as fetched now, so the freshness policy treats them as
+        immutable; the current season is left to be fetched. Seasons whose
+        files don't have the current layout and columns are left unmanaged
+        too, so they're refetched rather than served as the current version.
+
+        Args:
+            params_for: function of season -> the query parameters its data
+                came from
+            version: int, code/schema version of the stored frames
+            columns: list of the columns frames of that version have
+
+        Returns:
+            list of adopted seasons
+        '''
+        adopted = []
+        with self._locked():
+            manifest = self._load_manifest()
+            for season in self.seasons():
+                key = season_key(season)
+                if key in manifest or int(season) >= self.policy.season_now():
+                    continue
+                files = self._files(key)
+                if not files or not _matches_layout(files, columns):
+                    continue
+                now = time.time()
+                manifest[key] = {
+                    'params': params_for(season),
+                    'version': version,
+                    'season': season,
+                    'fetched_at': now,
+                    'last_access': now,
+                    'rows': sum(pq.ParquetFile(f).metadata.num_rows for f in files),
+                    'bytes': self._size(key),
+                }
+                adopted.append(season)
+            if adopted:
+                atomic_write_json(manifest, self.manifest_path)
+        return adopted
@@ -0,0 +1,273 @@
+'''
+Player identity across sources: ASA, fbref, Kaggle and the Data/ exports.
+
+Every source spells names its own way ("Joao Ortíz", "João Ortiz",
+"Brian Fernandez"), so joining on display names silently drops players.
+The index normalizes each ASA player's name once (accents stripped,
+case-folded, punctuation collapsed) and resolves any source's names to ASA
+player_id with a hashed lookup. Names that still don't match fall back to
+a fuzzy match, whose result (hit or miss) is cached on disk so it's only
+computed once. Names shared by several ASA players are settled by team
+when a roster is given, and otherwise left unresolved rather than guessed.
+
+Resolved ids come back as a categorical over every ASA player_id, so
+frames from different sources merge on integer codes:
+
+    identity = get_identity()
+    fbref = identity.attach(fbref_players, 'Player')
+    fbref.merge(gplus, on='player_id')
+'''
+import difflib
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from timbers.cache import CacheManager, FreshnessPolicy, atomic_write_json
+from timbers.reference import REFERENCE
+
+IDENTITY_DIR = os.environ.get(
+    'TIMBERS_IDENTITY_CACHE',
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Cache Data', 'identity'))
+)
+# Bump when normalize_names changes
+IDENTITY_VERSION = 1
+FUZZY_CUTOFF = 0.88
+
+# Letters NFKD doesn't split into a base letter and an accent
+_TRANSLITERATE = str.maketrans({'ø': 'o', 'Ø': 'O', 'æ': 'ae', 'Æ': 'AE', 'ß': 'ss', 'ł': 'l', 'Ł': 'L',
+                                'đ': 'd', 'Đ': 'D', 'ð': 'd', 'þ': 'th', 'ı': 'i', 'œ': 'oe', 'Œ': 'OE'})
+
+_IDENTITY = None
+_IDENTITY_LOCK = threading.Lock()
+
+
+def normalize_names(names):
+    '''
+    Comparable keys for display names, vectorized:
+    'Brian Fernández' -> 'brian fernandez', "D'Andre Yedlin-Jr." -> 'd andre yedlin jr'.
+
+    Args:
+        names: Series or list of names
+
+    Returns:
+        Series of keys (NaN where the name is missing), aligned with names
+    '''
+    names = pd.Series(names, dtype=object)
+    present = names.notna()
+    keys = names[present].astype(str).str.translate(_TRANSLITERATE).str.normalize('NFKD')
+    keys = keys.str.replace('[\u0300-\u036f]', '', regex=True).str.casefold()
+    keys = keys.str.replace(r'[^0-9a-z]+', ' ', regex=True).str.strip()
+    return keys.reindex(names.index)
+
+
+def normalize_name(name):
+    return normalize_names([name]).iloc[0]
+
+
+def _digest(players):
+    hashed = pd.util.hash_pandas_object(players[['player_id', 'player_name']].astype(str), index=False)
+    return hashlib.sha1(hashed.to_numpy().tobytes()).hexdigest()
+
+
+def rosters_from_gplus(frame):
+    '''
+    (player_id, team) pairs from a g+ season frame, with teams as
+    abbreviations to match fbref and the Data/ exports.
+    '''
+    rosters = frame[['player_id', 'team_id']].astype(object).drop_duplicates()
+    return pd.DataFrame({
+        'player_id': rosters['player_id'].to_numpy(),
+        'team': rosters['team_id'].map(REFERENCE.team_abbreviations()).to_numpy(),
+    })
+
+
+class IdentityIndex:
+    '''
+    Normalized ASA names -> player_id, plus the cached fuzzy matches.
+
+    Args:
+        names: dataframe of player_id, player_name and key (normalize_names
+            of player_name), one row per ASA player
+        rosters: optional dataframe of player_id and team, used to tell
+            apart players who share a name
+        aliases: optional dict of normalized name -> player_id, checked
+            before anything else (e.g. known re-spellings)
+        fuzzy: optional dict of normalized name -> player_id or None, the
+            cached fallback results
+        store: optional IdentityStore that new aliases and fuzzy results
+            are saved to
+    '''
+
+    def __init__(self, names, rosters=None, aliases=None, fuzzy=None, store=None):
+        self.names = names
+        self.store = store
+        self.digest = _digest(names)
+        self.categories = pd.Index(np.sort(names['player_id'].astype(str).unique()))
+        self.aliases = dict(aliases or {})
+        self.fuzzy = dict(fuzzy or {})
+        self.dirty = False
+
+        # Step 1: Unique keys resolve directly; shared ones need a team
+        counts = names['key'].value_counts()
+        unique = names[names['key'].map(counts) == 1]
+        self.by_key = pd.Series(unique['player_id'].astype(str).to_numpy(), index=unique['key'].to_numpy())
+        self.ambiguous = set(counts.index[counts > 1])
+        self._candidates = list(counts.index)
+
+        # Step 2: (key, team) for the shared names
+        self.by_key_team = None
+        if rosters is not None:
+            shared = names[names['key'].isin(self.ambiguous)].merge(rosters, on='player_id')
+            shared = shared.dropna(subset=['team']).drop_duplicates(['key', 'team'], keep=False)
+            self.by_key_team = pd.Series(shared['player_id'].astype(str).to_numpy(),
+                                         index=pd.MultiIndex.from_arrays([shared['key'], shared['team'].astype(str)]))
+
+    @classmethod
+    def build(cls, players, rosters=None, aliases=None, fuzzy=None):
+        '''
+        An index over an ASA players table (player_id, player_name).
+        '''
+        names = players[['player_id', 'player_name']].astype(object).drop_duplicates('player_id')
+        names = names.assign(key=normalize_names(names['player_name']).to_numpy()).dropna(subset=['key'])
+        return cls(names.reset_index(drop=True), rosters, aliases, fuzzy)
+
+    def _fuzzy_match(self, key):
+        '''
+        The single closest unambiguous ASA name above FUZZY_CUTOFF, or None.
+        Results are cached, misses included.
+        '''
+        if key in self.fuzzy:
+            return self.fuzzy[key]
+
+        match = None
+        close = difflib.get_close_matches(key, self._candidates, n=2, cutoff=FUZZY_CUTOFF)
+        if close and close[0] not in self.ambiguous:
+            # Two near-equal candidates are as good as none
+            scores = [difflib.SequenceMatcher(None, key, c).ratio() for c in close]
+            if len(close) == 1 or scores[0] - scores[1] > 0.02:
+                match = self.by_key[close[0]]
+        self.fuzzy[key] = match
+        self.dirty = True
+        return match
+
+    def resolve(self, names, teams=None, fuzzy=True):
+        '''
+        ASA player_id for each name.
+
+        Args:
+            names: Series or list of display names from any source
+            teams: optional team abbreviations aligned with names, used
+                for names shared by several ASA players
+            fuzzy: Boolean, try the fuzzy fallback for names with no
+                exact match
+
+        Returns:
+            categorical Series of player_id over every ASA player (NaN where
+            unresolved), aligned with names
+        '''
+        names = pd.Series(names, dtype=object)
+        keys = normalize_names(names)
+
+        # Step 1: Known aliases, then the hashed lookup on normalized names
+        ids = keys.map(self.aliases)
+        ids = ids.fillna(keys.map(self.by_key))
+
+        # Step 2: Shared names, by team
+        if teams is not None and self.by_key_team is not None:
+            missing = ids.isna() & keys.isin(self.ambiguous)
+            if missing.any():
+                teams = pd.Series(np.asarray(teams, dtype=object), index=names.index).astype(str)
+                lookup = pd.MultiIndex.from_arrays([keys[missing], teams[missing]])
+                found = self.by_key_team.reindex(lookup).to_numpy()
+                ids[missing] = found
+
+        # Step 3: Fuzzy fallback, once per distinct unmatched name
+        if fuzzy:
+            missing = ids.isna() & keys.notna() & ~keys.isin(self.ambiguous)
+            if missing.any():
+                matches = {key: self._fuzzy_match(key) for key in keys[missing].unique()}
+                ids[missing] = keys[missing].map(matches)
+                self.save()
+
+        return pd.Series(pd.Categorical(ids, categories=self.categories), index=names.index, name='player_id')
+
+    def attach(self, df, name_col, team_col=None, fuzzy=True):
+        '''
+        A copy of df with a player_id column resolved from name_col.
+        '''
+        teams = df[team_col] if team_col is not None else None
+        return df.assign(player_id=self.resolve(df[name_col], teams, fuzzy).to_numpy())
+
+    def add_alias(self, name, player_id):
+        '''
+        Map a source's spelling to a player for good, e.g. a nickname.
+        '''
+        self.aliases[normalize_name(name)] = str(player_id)
+        self.dirty = True
+        self.save()
+
+    def save(self):
+        if self.dirty and self.store is not None:
+            self.store.save(self)
+
+
+class IdentityStore:
+    '''
+    The IdentityIndex on disk: the normalized names table, rebuilt when the
+    ASA players table changes, and the aliases and fuzzy matches as JSON.
+    Fuzzy matches are dropped when the players change, aliases are kept.
+    '''
+
+    def __init__(self, root=IDENTITY_DIR):
+        self.root = root
+        self.cache = CacheManager(root, policy=FreshnessPolicy(current_ttl=None))
+        self.aliases_path = os.path.join(root, 'aliases.json')
+
+    def load(self, players=None, rosters=None):
+        '''
+        The index for players (default: the ASA reference players table).
+        '''
+        if players is None:
+            players = REFERENCE.players()
+        params = {'players': _digest(players)}
+
+        names = self.cache.read('names', params, IDENTITY_VERSION)
+        if names is None:
+            names = IdentityIndex.build(players).names
+            self.cache.write('names', names, params, IDENTITY_VERSION)
+
+        saved = {}
+        if os.path.exists(self.aliases_path):
+            with open(self.aliases_path) as f:
+                saved = json.load(f)
+        index = IdentityIndex(names, rosters, saved.get('aliases'), store=self)
+        if saved.get('players') == index.digest:
+            index.fuzzy = saved.get('fuzzy', {})
+        return index
+
+    def save(self, index):
+        '''
+        Persist the index's aliases and fuzzy matches.
+        '''
+        atomic_write_json({
+            'players': index.digest,
+            'aliases': index.aliases,
+            'fuzzy': index.fuzzy,
+        }, self.aliases_path)
+        index.dirty = False
+
+
+def get_identity(rosters=None):
+    '''
+    The process-wide IdentityIndex over the ASA players table, loaded on
+    first use.
+    '''
+    global _IDENTITY
+    with _IDENTITY_LOCK:
+        if _IDENTITY is None or rosters is not None:
+            _IDENTITY = IdentityStore(IDENTITY_DIR).load(rosters=rosters)
+        return _IDENTITY
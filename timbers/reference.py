@@ -0,0 +1,191 @@
+'''
+Local store of ASA's slow-changing reference tables: teams, players and
+each season's games.
+
+Every table is kept as a parquet file under one shared directory (so the
+Spider Chart and Performance Density scripts share it) and tracked by a
+CacheManager with a one day lifetime. Within a process each table is read
+or fetched once and then reused, so a run makes at most one request per
+table per day. If ASA can't be reached an expired copy is used instead.
+
+A lookup can name the ids it needs (require=...), e.g. the game ids of a
+fresh g+ pull. If any are missing (a game played since the table was
+cached, a new signing) the table is refetched once, and if they're still
+missing MissingReferenceError is raised rather than letting the caller
+write rows with no date or name. Each table loads under its own lock, so
+different tables can be fetched in parallel from separate threads.
+
+Lookups are indexed Series, e.g.
+    REFERENCE.team_abbreviations()['<team_id>']
+    REFERENCE.player_names().reindex(player_ids)
+    REFERENCE.game_dates('2026')
+'''
+import os
+import threading
+
+import pandas as pd
+import requests
+
+from timbers.asa import get_fetcher
+from timbers.cache import CacheManager, FreshnessPolicy
+
+REFERENCE_DIR = os.environ.get(
+    'TIMBERS_REFERENCE_CACHE',
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Cache Data', 'reference'))
+)
+REFERENCE_TTL = 24 * 3600
+# Bump when the stored columns change
+REFERENCE_VERSION = 1
+
+TEAM_COLUMNS = ['team_id', 'team_name', 'team_short_name', 'team_abbreviation']
+PLAYER_COLUMNS = ['player_id', 'player_name', 'primary_broad_position', 'primary_general_position']
+GAME_COLUMNS = ['game_id', 'date_time_utc', 'home_team_id', 'away_team_id', 'season_name']
+
+
+class MissingReferenceError(KeyError):
+    '''
+    Ids that aren't in a reference table even after refetching it.
+    '''
+
+
+class ReferenceStore:
+    '''
+    Teams, players and games tables, memoized in memory and on disk.
+    '''
+
+    def __init__(self, root=REFERENCE_DIR, league='mls', ttl=REFERENCE_TTL, fetcher=None):
+        self.league = league
+        self.cache = CacheManager(root, policy=FreshnessPolicy(current_ttl=ttl))
+        self._fetcher = fetcher
+        self._tables = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    @property
+    def fetcher(self):
+        return self._fetcher or get_fetcher()
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _fetch(self, method, kwargs, fresh):
+        fetcher = self.fetcher
+        if fresh and hasattr(fetcher, 'fetch_fresh'):
+            # Past the HTTP cache and the client's own entity tables
+            return fetcher.fetch_fresh(method, **kwargs)
+        return getattr(fetcher, method)(**kwargs)
+
+    def _load(self, key, params, fetch, columns, require=None):
+        table = self._load_once(key, params, fetch, columns)
+        if require is None:
+            return table
+
+        wanted = set(pd.Series(require, dtype=object).dropna().astype(str))
+        missing = wanted - set(table[columns[0]])
+        if missing:
+            # Newer than the cached table: refetch it once
+            table = self._load_once(key, params, fetch, columns, refresh=True)
+            missing = wanted - set(table[columns[0]])
+        if missing:
+            raise MissingReferenceError(
+                f"{len(missing)} id(s) not in {key} even after refetching it, e.g. {sorted(missing)[:5]}"
+            )
+        return table
+
+    def _load_once(self, key, params, fetch, columns, refresh=False):
+        # Only this table's lock is held while it's fetched
+        with self._key_lock(key):
+            if key in self._tables and not refresh:
+                return self._tables[key]
+
+            table = None if refresh else self.cache.read(key, params, REFERENCE_VERSION)
+            if table is None:
+                try:
+                    table = self._fetch(*fetch, fresh=refresh)
+                except requests.exceptions.RequestException as e:
+                    table = self.cache.read(key, params, REFERENCE_VERSION, allow_stale=True)
+                    if table is None:
+                        raise
+                    print(f"Could not refresh {key} ({e}), using cached copy")
+                else:
+                    # Only the columns the scripts join on, one row per id
+                    table = table.reindex(columns=columns).drop_duplicates(columns[0])
+                    table[columns[0]] = table[columns[0]].astype(str)
+                    table = table.reset_index(drop=True)
+                    self.cache.write(key, table, params, REFERENCE_VERSION)
+
+            with self._lock:
+                self._tables[key] = table
+            return table
+
+    def teams(self, require=None):
+        params = {'leagues': [self.league]}
+        return self._load(f"teams_{self.league}", params,
+                          ('get_teams', {'leagues': [self.league]}), TEAM_COLUMNS, require)
+
+    def players(self, require=None):
+        '''
+        Players table; require is an optional list of player ids it must hold.
+        '''
+        params = {'leagues': [self.league]}
+        return self._load(f"players_{self.league}", params,
+                          ('get_players', {'leagues': [self.league]}), PLAYER_COLUMNS, require)
+
+    def games(self, season, require=None):
+        '''
+        One season's games; require is an optional list of game ids it must hold.
+        '''
+        season = str(season)
+        params = {'leagues': [self.league], 'seasons': [season]}
+        return self._load(f"games_{self.league}_{season}", params,
+                          ('get_games', {'leagues': [self.league], 'seasons': [season]}), GAME_COLUMNS, require)
+
+    def team_abbreviations(self):
+        '''
+        Series of team_id -> team_abbreviation.
+        '''
+        return self.teams().set_index('team_id')['team_abbreviation']
+
+    def team_ids(self, abbreviation):
+        '''
+        Set of team ids with the given abbreviation, e.g. 'POR'.
+        '''
+        abbreviations = self.team_abbreviations()
+        return set(abbreviations.index[abbreviations == abbreviation])
+
+    def team_id(self, team_name):
+        '''
+        team_id for a full team name, e.g. 'Portland Timbers FC'.
+        '''
+        teams = self.teams()
+        return teams.loc[teams['team_name'] == team_name, 'team_id'].iloc[0]
+
+    def player_names(self, require=None):
+        '''
+        Series of player_id -> player_name.
+        '''
+        return self.players(require).set_index('player_id')['player_name']
+
+    def player_positions(self):
+        '''
+        Series of player_id -> primary general position.
+        '''
+        return self.players().set_index('player_id')['primary_general_position']
+
+    def game_dates(self, season, require=None):
+        '''
+        Series of game_id -> kickoff time (UTC) for one season.
+        '''
+        games = self.games(season, require)
+        return pd.Series(pd.to_datetime(games['date_time_utc']).to_numpy(), index=games['game_id'], name='date_time_utc')
+
+    def clear(self):
+        '''
+        Forget the in-memory copies, so the next lookup re-checks the disk cache.
+        '''
+        with self._lock:
+            self._tables.clear()
+
+
+REFERENCE = ReferenceStore()
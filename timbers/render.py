@@ -0,0 +1,83 @@
+'''
+Batch figure rendering shared by the radar and matchday scripts.
+
+Jobs are rendered across a pool of worker processes on the Agg backend.
+A manifest in each output directory maps every written file to the digest
+of the inputs it was drawn from, so a rerun only renders the figures whose
+inputs changed (or whose file went missing). The manifest is written once,
+atomically, after the pool finishes; a figure that fails keeps its old
+entry, so it is retried next time.
+'''
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from timbers.cache import atomic_write_json
+
+
+def _init_worker(initializer, initargs):
+    import matplotlib
+    matplotlib.use('Agg')
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def render_jobs(jobs, render, manifest_name, path_key, digest, workers=None, force=False,
+                initializer=None, initargs=None):
+    '''
+    Render the jobs whose output is missing or out of date.
+
+    Args:
+        jobs: list of job dicts
+        render: module-level function of a job -> the path it wrote, run in
+            the workers
+        manifest_name: String, file name of the manifest in each output
+            directory
+        path_key: String, the job key holding its output path
+        digest: function of a job -> String digest of its inputs
+        workers: number of worker processes, defaults to the CPU count
+        force: Boolean, re-render everything
+        initializer: optional module-level function run once in each worker
+        initargs: optional function of the jobs to render -> the
+            initializer's arguments, only called if anything is rendered
+
+    Returns:
+        list of written output paths, number of jobs skipped as unchanged
+    '''
+    # Step 1: Load the manifests and keep the jobs that need drawing
+    manifests = {}
+    todo = []
+    for job in jobs:
+        out_dir = os.path.dirname(job[path_key]) or '.'
+        if out_dir not in manifests:
+            path = os.path.join(out_dir, manifest_name)
+            manifests[out_dir] = {}
+            if os.path.exists(path):
+                with open(path) as f:
+                    manifests[out_dir] = json.load(f)
+        job_digest = digest(job)
+        if not force and manifests[out_dir].get(job[path_key]) == job_digest and os.path.exists(job[path_key]):
+            continue
+        todo.append((job, job_digest))
+
+    # Step 2: Render them across the pool
+    written = []
+    if todo:
+        args = initargs([job for job, _ in todo]) if initargs is not None else ()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(initializer, args)) as pool:
+            futures = {pool.submit(render, job): (job, job_digest) for job, job_digest in todo}
+            for future in as_completed(futures):
+                job, job_digest = futures[future]
+                try:
+                    written.append(future.result())
+                except Exception as e:
+                    print(f"Failed to render {job[path_key]}: {e}")
+                    continue
+                manifests[os.path.dirname(job[path_key]) or '.'][job[path_key]] = job_digest
+
+    # Step 3: Record what was drawn
+    for out_dir, manifest in manifests.items():
+        atomic_write_json(manifest, os.path.join(out_dir, manifest_name))
+
+    return written, len(jobs) - len(todo)
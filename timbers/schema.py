@@ -0,0 +1,61 @@
+'''
+Compact in-memory dtypes for goals-added frames.
+
+Ids, names, positions and action types repeat on every row, so they are
+stored as categoricals (dictionary-encoded in parquet). Counts and minutes
+fit in int32. The g+ sums are float32: ASA publishes them to a handful of
+decimals, well within float32's ~7 significant digits. Per 90 values stay
+float64 because percentiles rank them, and rounding to float32 can merge
+near-identical values into ties.
+'''
+import pandas as pd
+
+ACTION_TYPES = ['Dribbling', 'Fouling', 'Interrupting', 'Passing', 'Receiving', 'Shooting']
+ACTION_TYPE_DTYPE = pd.CategoricalDtype(ACTION_TYPES)
+
+CATEGORY_COLUMNS = ['player_id', 'player_name', 'general_position', 'team_id', 'game_id']
+FLOAT32_COLUMNS = ['goals_added_raw', 'goals_added_above_avg']
+INT32_COLUMNS = ['count_actions', 'minutes_played']
+
+
+def compact(df):
+    '''
+    Return a copy of a goals-added frame with the compact dtypes applied to
+    whichever of the known columns it has. Columns that can't be converted
+    losslessly (missing counts, unknown action types) are left as they are.
+    '''
+    df = df.copy()
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    if 'action_type' in df.columns:
+        known = df['action_type'].dropna().isin(ACTION_TYPES).all()
+        df['action_type'] = df['action_type'].astype(ACTION_TYPE_DTYPE if known else 'category')
+
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('float32')
+
+    for col in INT32_COLUMNS:
+        if col in df.columns and not df[col].isna().any():
+            df[col] = df[col].astype('int32')
+
+    return df
+
+
+def memory_report(before, after):
+    '''
+    Deep memory use of a frame before and after compact(), per column and
+    in total.
+
+    Returns:
+        dataframe with before/after/saved bytes per column plus a 'total' row
+    '''
+    report = pd.DataFrame({
+        'before': before.memory_usage(deep=True, index=False),
+        'after': after.memory_usage(deep=True, index=False),
+    })
+    report.loc['total'] = report.sum()
+    report['saved'] = report['before'] - report['after']
+    return report
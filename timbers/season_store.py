@@ -0,0 +1,218 @@
+import json
+import os
+
+import pandas as pd
+
+from timbers.cache import atomic_write_json, atomic_write_parquet
+from timbers.flatten import flatten_nested
+from timbers.reference import REFERENCE, MissingReferenceError
+from timbers.schema import compact
+
+# Bump whenever the aggregation in SeasonStore.grouped or the stored
+# layout changes, so cached season frames built by older code are refetched
+# instead of served
+GPLUS_SCHEMA_VERSION = 3
+
+SUM_COLUMNS = ['goals_added_raw', 'goals_added_above_avg', 'count_actions', 'minutes_played']
+META_COLUMNS = ['player_id', 'general_position', 'team_id']
+# The columns of the frame SeasonStore.grouped builds, in order
+GPLUS_COLUMNS = ['player_id', 'action_type', *SUM_COLUMNS, 'goals_added_raw_per90',
+                 'goals_added_above_avg_per90', 'player_name', 'general_position', 'team_id']
+
+
+class SeasonStore:
+    '''
+    Game-partitioned local store of one season's per-game g+ rows.
+
+    Each game's flattened rows live in their own "{date}_{game_id}.parquet"
+    file under root/season. A state file records the ingested game ids and
+    the latest game date (the high-water mark), so a refresh only asks ASA
+    for games on or after that date. The per-player/per-action_type sums are
+    kept alongside and updated from the new games only.
+
+    The games being folded into the sums are recorded as pending before the
+    sums are written. If a refresh dies before it records them as ingested,
+    the next one rebuilds the sums from the game files instead of adding
+    those games twice.
+    '''
+
+    def __init__(self, season, root="Cache Data/games"):
+        self.season = str(season)
+        self.path = os.path.join(root, self.season)
+        self.state_path = os.path.join(self.path, "state.json")
+        self.totals_path = os.path.join(self.path, "totals.parquet")
+        self.meta_path = os.path.join(self.path, "players.parquet")
+        self.state = self._load_state()
+
+    def _load_state(self):
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                return json.load(f)
+        return {'high_water_mark': None, 'game_ids': [], 'pending_game_ids': []}
+
+    @property
+    def high_water_mark(self):
+        return self.state['high_water_mark']
+
+    def _fetch(self, asa):
+        if self.high_water_mark is None:
+            return asa.get_player_goals_added(
+                leagues=["mls"],
+                season_name=self.season,
+                split_by_games=True
+            )
+
+        # Games on the high-water date are re-requested so late kickoffs
+        # that day aren't missed; already stored game ids are dropped below.
+        return asa.get_player_goals_added(
+            leagues=["mls"],
+            start_date=self.high_water_mark,
+            end_date=f"{self.season}-12-31",
+            split_by_games=True
+        )
+
+    def _attach_dates(self, gplus_data):
+        if 'date_time_utc' not in gplus_data.columns:
+            # Games newer than the cached games table make it refetch
+            game_dates = REFERENCE.game_dates(self.season, require=gplus_data['game_id'].unique())
+            gplus_data['date_time_utc'] = gplus_data['game_id'].map(game_dates)
+
+        gplus_data['game_date'] = pd.to_datetime(gplus_data['date_time_utc']).dt.strftime('%Y-%m-%d')
+        undated = gplus_data.loc[gplus_data['game_date'].isna(), 'game_id'].unique()
+        if len(undated):
+            # Undated rows would be dropped from the game files but still
+            # counted in the sums, so nothing is written
+            raise MissingReferenceError(f"No kickoff time for {len(undated)} game(s), e.g. {sorted(undated)[:5]}")
+        return gplus_data
+
+    def refresh(self, asa):
+        '''
+        Pull any games newer than the high-water mark and fold them into the
+        store.
+
+        Args:
+            asa: AmericanSoccerAnalysis client or timbers.asa.ASAFetcher
+
+        Returns:
+            Number of new games ingested
+        '''
+        self._recover()
+        gplus_data = self._fetch(asa)
+        if gplus_data is None or gplus_data.empty:
+            return 0
+
+        gplus_data['game_id'] = gplus_data['game_id'].astype(str)
+        known = set(self.state['game_ids'])
+        gplus_data = gplus_data[~gplus_data['game_id'].isin(known)]
+        if gplus_data.empty:
+            return 0
+
+        gplus_data = self._attach_dates(gplus_data)
+        new_rows = compact(flatten_nested(gplus_data, 'data').reset_index(drop=True))
+
+        os.makedirs(self.path, exist_ok=True)
+
+        # Step 1: Write one partition per game
+        for (game_date, game_id), game_rows in new_rows.groupby(['game_date', 'game_id'], sort=False, observed=True):
+            atomic_write_parquet(game_rows, os.path.join(self.path, f"{game_date}_{game_id}.parquet"), index=False)
+
+        # Step 2: Mark the new games pending, then fold them into the running sums
+        new_ids = new_rows['game_id'].unique().tolist()
+        self.state['pending_game_ids'] = sorted(new_ids)
+        atomic_write_json(self.state, self.state_path)
+        self._update_totals(new_rows)
+
+        # Step 3: Record them as ingested and advance the high-water mark
+        self._mark_ingested(new_ids, new_rows['game_date'].max())
+
+        return len(new_ids)
+
+    def _mark_ingested(self, game_ids, latest):
+        if self.high_water_mark is None or latest > self.high_water_mark:
+            self.state['high_water_mark'] = latest
+        self.state['game_ids'] = sorted(set(self.state['game_ids']) | set(game_ids))
+        self.state['pending_game_ids'] = []
+        atomic_write_json(self.state, self.state_path)
+
+    def _recover(self):
+        '''
+        Finish a refresh that was interrupted while folding games into the
+        sums: whether they were added or not, the sums are rebuilt from the
+        stored game files.
+        '''
+        pending = self.state.get('pending_game_ids')
+        if not pending:
+            return
+
+        game_rows = self.load_games()
+        for path in (self.totals_path, self.meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._update_totals(game_rows)
+        self._mark_ingested(pending, game_rows['game_date'].max())
+
+    def _update_totals(self, new_rows):
+        new_totals = new_rows.groupby(['player_id', 'action_type'], observed=True)[SUM_COLUMNS].sum().reset_index()
+        new_meta = new_rows[META_COLUMNS].drop_duplicates()
+
+        if os.path.exists(self.totals_path):
+            totals = pd.concat([pd.read_parquet(self.totals_path), new_totals], ignore_index=True)
+            new_totals = totals.groupby(['player_id', 'action_type'], observed=True)[SUM_COLUMNS].sum().reset_index()
+            new_meta = pd.concat([pd.read_parquet(self.meta_path), new_meta], ignore_index=True).drop_duplicates()
+
+        atomic_write_parquet(compact(new_totals), self.totals_path, index=False)
+        atomic_write_parquet(compact(new_meta), self.meta_path, index=False)
+
+    def game_files(self):
+        '''
+        game_id -> path of every stored game, in kickoff order.
+        '''
+        names = sorted(
+            name for name in os.listdir(self.path)
+            if name.endswith('.parquet') and not name.startswith('.')
+            and name not in ('totals.parquet', 'players.parquet')
+        ) if os.path.exists(self.path) else []
+        # Files are "{YYYY-MM-DD}_{game_id}.parquet"
+        return {name[11:-len('.parquet')]: os.path.join(self.path, name) for name in names}
+
+    def load_games(self, columns=None, exclude_games=None):
+        '''
+        Read the stored per-game rows (one row per player, game and action type).
+
+        Args:
+            columns: optional list of columns to read
+            exclude_games: optional set of game ids to skip, e.g. the games
+                a consumer has already processed
+        '''
+        exclude_games = set(exclude_games or ())
+        files = [path for game_id, path in self.game_files().items() if game_id not in exclude_games]
+        if not files:
+            return pd.DataFrame(columns=columns)
+        return pd.concat([pd.read_parquet(f, columns=columns) for f in files], ignore_index=True)
+
+    def grouped(self, player_names=None):
+        '''
+        Build the season's per-player/per-action_type frame that get_data
+        returns, from the running sums.
+
+        Args:
+            player_names: optional Series of player_id -> player_name,
+                defaults to the reference players table
+
+        Returns:
+            grouped dataframe with sums, per 90 values and player info
+        '''
+        grouped_data = pd.read_parquet(self.totals_path)
+
+        # Per 90 values are ranked, so they're kept in float64
+        per90_minutes = grouped_data['minutes_played'].astype('float64') / 90
+        grouped_data['goals_added_raw_per90'] = grouped_data['goals_added_raw'].astype('float64') / per90_minutes
+        grouped_data['goals_added_above_avg_per90'] = grouped_data['goals_added_above_avg'].astype('float64') / per90_minutes
+
+        meta = pd.read_parquet(self.meta_path)
+        if player_names is None:
+            player_names = REFERENCE.player_names(require=meta['player_id'].unique())
+        meta['player_name'] = meta['player_id'].map(player_names)
+        meta = meta[['player_id', 'player_name', 'general_position', 'team_id']]
+
+        return compact(pd.merge(grouped_data, meta, on='player_id', how='left'))
@@ -0,0 +1,227 @@
+'''
+Typed store of the dated ASA exports in Data/.
+
+Files named american_soccer_analysis_<league>_<dataset>_<YYYY-MM-DD>.csv
+(or .xlsx) are snapshots of one dataset, e.g. goals-added_players or
+xgoals_teams, as of that date. Every snapshot of a dataset is parsed once
+into one table with a snapshot column: currency ('$1,234,567') and
+percentage ('84.6%') columns become numbers, repeated labels become
+categoricals, and rows are deduplicated on (snapshot, player/team). The
+tables are cached as parquet and rebuilt only when a file is added or
+changed, so queries never re-read the CSVs.
+
+    SNAPSHOTS.as_of('goals-added_players', '2025-05-01')
+    SNAPSHOTS.changes('xgoals_teams', '2025-04-18', '2025-07-10')
+'''
+import importlib.util
+import os
+import re
+import threading
+
+import pandas as pd
+
+from timbers.cache import CacheManager, FreshnessPolicy
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Data'))
+SNAPSHOT_DIR = os.environ.get(
+    'TIMBERS_SNAPSHOT_CACHE',
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Cache Data', 'snapshots'))
+)
+# Bump when the parsing changes
+SNAPSHOT_VERSION = 1
+
+FILE_PATTERN = re.compile(
+    r'^american_soccer_analysis_(?P<league>[a-z]+)_(?P<dataset>.+)_(?P<date>\d{4}-\d{2}-\d{2})\.(?P<ext>csv|xlsx)$'
+)
+
+# One row per player per team per season (traded players have a row per team)
+PLAYER_KEYS = ['Player', 'Team', 'Season']
+TEAM_KEYS = ['Team', 'Season']
+CATEGORY_COLUMNS = ['Team', 'Position']
+DATE_COLUMNS = ['Date']
+
+_CURRENCY = r'^-?\$[\d,]+(?:\.\d+)?$'
+_PERCENT = r'^-?[\d.]+%$'
+
+
+def parse_filename(name):
+    '''
+    (league, dataset, snapshot date) for a Data/ export file name, or None.
+    '''
+    match = FILE_PATTERN.match(name)
+    if match is None:
+        return None
+    return match['league'], match['dataset'], pd.Timestamp(match['date'])
+
+
+def key_columns(columns):
+    return PLAYER_KEYS if 'Player' in columns else TEAM_KEYS
+
+
+def _matches(values, pattern):
+    values = values.dropna()
+    return len(values) > 0 and values.astype(str).str.match(pattern).all()
+
+
+def parse_numbers(values):
+    '''
+    Currency and percentage strings as numbers, in one vectorized pass:
+    '$12,000,000' -> 12000000, '84.6%' -> 84.6.
+    '''
+    return pd.to_numeric(values.astype(str).str.replace(r'[$,%]', '', regex=True), errors='coerce')
+
+
+def type_columns(df):
+    '''
+    Parse currency, percentage and date columns and make repeated labels
+    categorical.
+    '''
+    df = df.drop(columns=[col for col in df.columns if str(col).startswith('Unnamed')])
+    for col in df.columns:
+        values = df[col]
+        if col in DATE_COLUMNS:
+            df[col] = pd.to_datetime(values, errors='coerce')
+        elif not pd.api.types.is_numeric_dtype(values) and \
+                (_matches(values, _CURRENCY) or _matches(values, _PERCENT)):
+            df[col] = parse_numbers(values)
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    if 'Season' in df.columns:
+        df['Season'] = df['Season'].astype('int32')
+    return df
+
+
+def readable(path):
+    # Excel exports need openpyxl; without it they're left out (and the
+    # table is rebuilt with them once it's installed)
+    return not path.endswith('.xlsx') or importlib.util.find_spec('openpyxl') is not None
+
+
+def read_snapshot(path):
+    if path.endswith('.xlsx'):
+        return pd.read_excel(path)
+    return pd.read_csv(path)
+
+
+class SnapshotStore:
+    '''
+    Every dated export in data_dir, one table per dataset, memoized in
+    memory and on disk.
+    '''
+
+    def __init__(self, data_dir=DATA_DIR, root=SNAPSHOT_DIR):
+        self.data_dir = data_dir
+        # Validity is tracked by the source files, not by age
+        self.cache = CacheManager(root, policy=FreshnessPolicy(current_ttl=None))
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def files(self):
+        '''
+        dict of dataset -> list of (snapshot date, path), oldest first.
+        '''
+        found = {}
+        names = sorted(os.listdir(self.data_dir)) if os.path.isdir(self.data_dir) else []
+        for name in names:
+            parsed = parse_filename(name)
+            if parsed is None:
+                continue
+            _, dataset, date = parsed
+            found.setdefault(dataset, []).append((date, os.path.join(self.data_dir, name)))
+        return {dataset: sorted(entries) for dataset, entries in found.items()}
+
+    def datasets(self):
+        return sorted(self.files())
+
+    def _build(self, entries):
+        frames = [type_columns(read_snapshot(path)).assign(snapshot=date) for date, path in entries]
+        table = pd.concat(frames, ignore_index=True)
+
+        # Labels are categorical again after the concat, over every snapshot's values
+        for col in CATEGORY_COLUMNS:
+            if col in table.columns:
+                table[col] = table[col].astype('category')
+
+        keys = key_columns(table.columns)
+        table = table.drop_duplicates(['snapshot'] + keys, keep='last')
+        columns = ['snapshot'] + keys + [col for col in table.columns if col not in keys and col != 'snapshot']
+        return table[columns].sort_values(['snapshot'] + keys).reset_index(drop=True)
+
+    def table(self, dataset):
+        '''
+        Every snapshot of a dataset in one frame, with a snapshot column.
+        '''
+        with self._lock:
+            if dataset in self._tables:
+                return self._tables[dataset]
+
+            entries = [(date, path) for date, path in self.files().get(dataset, []) if readable(path)]
+            if not entries:
+                raise KeyError(f"No snapshots of {dataset} in {self.data_dir}")
+            params = {'files': {os.path.basename(path): [os.path.getsize(path), os.path.getmtime(path)]
+                                for _, path in entries}}
+            table = self.cache.read(dataset, params, SNAPSHOT_VERSION)
+            if table is None:
+                table = self._build(entries)
+                self.cache.write(dataset, table, params, SNAPSHOT_VERSION)
+
+            self._tables[dataset] = table
+            return table
+
+    def snapshots(self, dataset):
+        return sorted(self.table(dataset)['snapshot'].unique())
+
+    def as_of(self, dataset, date, season=None):
+        '''
+        The latest value of every player/team at a date: each one's row from
+        the newest snapshot taken on or before it.
+
+        Args:
+            dataset: String, e.g. 'goals-added_players'
+            date: date or String, 'YYYY-MM-DD'
+            season: optional season to restrict to
+
+        Returns:
+            dataframe, one row per player/team
+        '''
+        table = self.table(dataset)
+        keys = key_columns(table.columns)
+        rows = table[table['snapshot'] <= pd.Timestamp(date)]
+        if season is not None:
+            rows = rows[rows['Season'] == int(season)]
+        # The table is sorted by snapshot, so the last row per key is the newest
+        return rows.drop_duplicates(keys, keep='last').reset_index(drop=True)
+
+    def changes(self, dataset, start, end, columns=None, season=None):
+        '''
+        Change in every numeric column between the values as of two dates,
+        for the players/teams present at both.
+
+        Returns:
+            dataframe of the keys, the two snapshot dates used and one
+            '<column>_change' column per value column
+        '''
+        before = self.as_of(dataset, start, season)
+        after = self.as_of(dataset, end, season)
+        keys = key_columns(after.columns)
+        if columns is None:
+            columns = [col for col in after.columns
+                       if col not in keys and col != 'snapshot' and pd.api.types.is_numeric_dtype(after[col])]
+
+        joined = pd.merge(before[keys + ['snapshot'] + columns], after[keys + ['snapshot'] + columns],
+                          on=keys, suffixes=('_start', '_end'))
+        result = joined[keys + ['snapshot_start', 'snapshot_end']].copy()
+        for col in columns:
+            result[f"{col}_change"] = joined[f"{col}_end"] - joined[f"{col}_start"]
+        return result
+
+    def clear(self):
+        '''
+        Forget the in-memory copies, so the next lookup re-checks the disk cache.
+        '''
+        with self._lock:
+            self._tables.clear()
+
+
+SNAPSHOTS = SnapshotStore()